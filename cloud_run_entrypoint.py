@@ -1,20 +1,54 @@
 """Cloud Run entrypoint for SSE/HTTP transport."""
 
 import os
+import threading
 
-# Cloud Run provides the port via PORT; FastMCP reads FASTMCP_* at import time.
-os.environ["FASTMCP_PORT"] = os.environ.get("PORT", "8080")
-os.environ["FASTMCP_HOST"] = "0.0.0.0"
+# Resolve the listen address once at import; Cloud Run provides the port via PORT.
+PORT = int(os.environ.get("PORT", "8080"))
+HOST = "0.0.0.0"
 # Avoid Cloud Run edge conflicts on /sse by using a custom SSE path.
-os.environ.setdefault("FASTMCP_SSE_PATH", "/mcp/stream")
-os.environ.setdefault("FASTMCP_MESSAGE_PATH", "/mcp/messages/")
+SSE_PATH = os.environ.get("FASTMCP_SSE_PATH", "/mcp/stream")
+MESSAGE_PATH = os.environ.get("FASTMCP_MESSAGE_PATH", "/mcp/messages/")
 
-from remarkable_mcp.server import mcp
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
 
-# Ensure FastMCP binds to Cloud Run's host/port even if env parsing is skipped.
-mcp.settings.host = "0.0.0.0"
-mcp.settings.port = int(os.environ.get("PORT", "8080"))
-mcp.settings.sse_path = os.environ.get("FASTMCP_SSE_PATH", "/mcp/stream")
-mcp.settings.message_path = os.environ.get("FASTMCP_MESSAGE_PATH", "/mcp/messages/")
+from remarkable_mcp.server import mcp  # noqa: E402
 
-mcp.run(transport="sse")
+# The SSE stream already carries "Cache-Control: no-store" and "X-Accel-Buffering: no"
+# (set by sse-starlette), so proxies don't buffer events. Cloud Run's --use-http2 needs an
+# h2c-capable server, which uvicorn is not, so the service stays on HTTP/1.1 end to end.
+
+# FastMCP takes its settings from constructor arguments, not FASTMCP_* env vars, so the
+# server is built for 127.0.0.1. Rebind it here.
+mcp.settings.host = HOST
+mcp.settings.port = PORT
+mcp.settings.sse_path = SSE_PATH
+mcp.settings.message_path = MESSAGE_PATH
+# The localhost-only Host/Origin allowlist FastMCP applies for 127.0.0.1 would reject
+# requests to the Cloud Run URL; FastMCP leaves it off for non-loopback hosts.
+mcp.settings.transport_security = None
+
+
+@mcp.custom_route("/_ah/health", methods=["GET"])
+async def health(request: Request) -> PlainTextResponse:
+    """Startup/liveness probe that never touches the reMarkable client."""
+    return PlainTextResponse("ok")
+
+
+def _warm():
+    """Create the cloud client and fetch a user token during startup CPU boost."""
+    from remarkable_mcp.api import get_rmapi, use_ssh
+
+    if use_ssh():
+        return
+    try:
+        get_rmapi().renew_token()
+    except Exception:
+        # Tool calls will surface a proper error if credentials are missing.
+        pass
+
+
+if __name__ == "__main__":
+    threading.Thread(target=_warm, name="rmapi-warmup", daemon=True).start()
+    mcp.run(transport="sse")
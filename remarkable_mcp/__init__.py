@@ -2,21 +2,25 @@
 reMarkable MCP Server
 
 An MCP server that provides access to reMarkable tablet data through the reMarkable Cloud API.
-"""
 
-# Capability checking utilities
-from remarkable_mcp.capabilities import (
-    client_supports_elicitation,
-    client_supports_experimental,
-    client_supports_roots,
-    client_supports_sampling,
-    get_client_capabilities,
-    get_client_info,
-    get_protocol_version,
-)
+Importing this package is kept cheap: the server, transports, and capability
+helpers are only loaded when first accessed, so entry points like
+``remarkable-mcp --help`` don't pay for the full MCP stack.
+"""
 
 __version__ = "0.1.0"
 
+# Capability checking utilities, resolved lazily from remarkable_mcp.capabilities
+_CAPABILITY_EXPORTS = (
+    "get_client_capabilities",
+    "client_supports_sampling",
+    "client_supports_elicitation",
+    "client_supports_roots",
+    "client_supports_experimental",
+    "get_client_info",
+    "get_protocol_version",
+)
+
 
 def get_mcp():
     """Get the MCP server instance. Only imports when called."""
@@ -25,15 +29,20 @@ def get_mcp():
     return mcp
 
 
+def __getattr__(name: str):
+    """Lazily resolve capability helpers on first access (PEP 562)."""
+    if name in _CAPABILITY_EXPORTS:
+        from remarkable_mcp import capabilities
+
+        value = getattr(capabilities, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "get_mcp",
     "__version__",
     # Capability checking
-    "get_client_capabilities",
-    "client_supports_sampling",
-    "client_supports_elicitation",
-    "client_supports_roots",
-    "client_supports_experimental",
-    "get_client_info",
-    "get_protocol_version",
+    *_CAPABILITY_EXPORTS,
 ]
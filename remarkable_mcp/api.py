@@ -2,18 +2,49 @@
 reMarkable Cloud API client helpers.
 """
 
+import functools
 import json as json_module
+import operator
 import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-# Configuration - check env var first, then fall back to file
-REMARKABLE_TOKEN = os.environ.get("REMARKABLE_TOKEN")
-REMARKABLE_USE_SSH = os.environ.get("REMARKABLE_USE_SSH", "").lower() in ("1", "true", "yes")
 REMARKABLE_CONFIG_DIR = Path.home() / ".remarkable"
 REMARKABLE_TOKEN_FILE = REMARKABLE_CONFIG_DIR / "token"
+RMAPI_FILE = Path.home() / ".rmapi"
 CACHE_DIR = REMARKABLE_CONFIG_DIR / "cache"
 
+# Cloud client shared across tool calls so the user token is renewed once, not per call
+CLIENT_TTL_SECONDS = 3600
+_CLIENT = None
+_CLIENT_EXPIRES = 0.0
+_CLIENT_LOCK = threading.Lock()
+
+# Both Document types (cloud and SSH) expose ID and Parent properties
+_ID_AND_PARENT = operator.attrgetter("ID", "Parent")
+
+# Single-entry (input, result) caches for index_items() and build_path_index()
+_index_cache: Tuple[Any, Any] = (None, None)
+_path_cache: Tuple[Any, Any] = (None, None)
+
+
+# Configuration - check env var first, then fall back to file.
+# Read on first use so the environment can be set after import (e.g. by the CLI).
+@functools.cache
+def remarkable_token() -> Optional[str]:
+    """Get the token from REMARKABLE_TOKEN, if set."""
+    return os.environ.get("REMARKABLE_TOKEN")
+
+
+@functools.cache
+def use_ssh() -> bool:
+    """Check whether SSH transport is enabled via REMARKABLE_USE_SSH."""
+    return os.environ.get("REMARKABLE_USE_SSH", "").lower() in ("1", "true", "yes")
+
 
 def get_rmapi():
     """
@@ -21,26 +52,44 @@ def get_rmapi():
 
     Uses SSH transport if REMARKABLE_USE_SSH=1, otherwise cloud API.
     Returns either RemarkableClient or SSHClient (both have compatible interfaces).
+    The cloud client is cached for CLIENT_TTL_SECONDS; see invalidate_rmapi().
     """
+    global _CLIENT, _CLIENT_EXPIRES
+
     # Check if SSH mode is enabled
-    if REMARKABLE_USE_SSH:
+    if use_ssh():
         from remarkable_mcp.ssh import create_ssh_client
 
         return create_ssh_client()
 
-    # Cloud API mode
+    with _CLIENT_LOCK:
+        if _CLIENT is None or time.monotonic() >= _CLIENT_EXPIRES:
+            _CLIENT = _load_cloud_client()
+            _CLIENT_EXPIRES = time.monotonic() + CLIENT_TTL_SECONDS
+        return _CLIENT
+
+
+def invalidate_rmapi():
+    """Drop the cached cloud client so the next get_rmapi() call reloads credentials."""
+    global _CLIENT
+
+    with _CLIENT_LOCK:
+        _CLIENT = None
+
+
+def _load_cloud_client():
+    """Create a cloud API client from REMARKABLE_TOKEN or ~/.rmapi."""
     from remarkable_mcp.sync import load_client_from_token
 
     # If token is provided via environment, use it
-    if REMARKABLE_TOKEN:
+    token = remarkable_token()
+    if token:
         # Also save to ~/.rmapi for compatibility
-        rmapi_file = Path.home() / ".rmapi"
-        rmapi_file.write_text(REMARKABLE_TOKEN)
-        return load_client_from_token(REMARKABLE_TOKEN)
+        _write_rmapi_file(token)
+        return load_client_from_token(token)
 
     # Load from file
-    rmapi_file = Path.home() / ".rmapi"
-    if not rmapi_file.exists():
+    if not RMAPI_FILE.exists():
         raise RuntimeError(
             "No reMarkable token found. Register first:\n"
             "  uvx remarkable-mcp --register <code>\n\n"
@@ -50,12 +99,35 @@ def get_rmapi():
         )
 
     try:
-        token_json = rmapi_file.read_text()
+        token_json = RMAPI_FILE.read_text()
         return load_client_from_token(token_json)
     except Exception as e:
         raise RuntimeError(f"Failed to initialize reMarkable client: {e}")
 
 
+def _write_rmapi_file(content: str) -> None:
+    """
+    Write ~/.rmapi, skipping the write if it already has this content.
+
+    Writes go to a temp file that is renamed into place, so a container
+    stopped mid-write can't leave a truncated token behind.
+    """
+    try:
+        if RMAPI_FILE.read_text() == content:
+            return
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=RMAPI_FILE.parent, prefix=".rmapi.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, RMAPI_FILE)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
 def ensure_config_dir():
     """Ensure configuration directory exists."""
     REMARKABLE_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -74,9 +146,8 @@ def register_and_get_token(one_time_code: str) -> str:
         token_data = register_device(one_time_code)
 
         # Save to ~/.rmapi for compatibility
-        rmapi_file = Path.home() / ".rmapi"
         token_json = json_module.dumps(token_data)
-        rmapi_file.write_text(token_json)
+        _write_rmapi_file(token_json)
 
         return token_json
     except Exception as e:
@@ -90,26 +161,101 @@ def get_items_by_id(collection) -> Dict[str, Any]:
 
 def get_items_by_parent(collection) -> Dict[str, List]:
     """Build a lookup dict of items grouped by parent ID."""
-    items_by_parent: Dict[str, List] = {}
+    items_by_parent: Dict[str, List] = defaultdict(list)
     for item in collection:
-        parent = item.Parent if hasattr(item, "Parent") else ""
-        if parent not in items_by_parent:
-            items_by_parent[parent] = []
-        items_by_parent[parent].append(item)
-    return items_by_parent
+        items_by_parent[getattr(item, "Parent", "")].append(item)
+    # Plain dict so lookups of missing parents don't insert empty lists
+    return dict(items_by_parent)
+
+
+def index_items(collection) -> Tuple[Dict[str, Any], Dict[str, List]]:
+    """
+    Build both lookup dicts in a single pass over the collection.
+
+    Returns (items_by_id, items_by_parent), equivalent to calling
+    get_items_by_id() and get_items_by_parent() separately. The result for
+    the most recent collection is reused while the client keeps returning
+    the same list (i.e. the cloud tree hasn't changed); treat it as read-only.
+    """
+    global _index_cache
+
+    cached_collection, cached = _index_cache
+    if cached_collection is collection:
+        return cached
+
+    items_by_id: Dict[str, Any] = {}
+    items_by_parent: Dict[str, List] = {}
+    try:
+        for item in collection:
+            item_id, parent = _ID_AND_PARENT(item)
+            items_by_id[item_id] = item
+            items_by_parent.setdefault(parent, []).append(item)
+    except AttributeError:
+        # Some item lacks a Parent: redo the pass, treating it as root like get_items_by_parent()
+        items_by_id = {item.ID: item for item in collection}
+        items_by_parent = get_items_by_parent(collection)
+
+    # Holding the collection keeps its id() from being reused by another list
+    result = (items_by_id, items_by_parent)
+    _index_cache = (collection, result)
+    return result
 
 
 def get_item_path(item, items_by_id: Dict[str, Any]) -> str:
     """Get the full path of an item."""
-    path_parts = [item.VissibleName]
-    parent_id = item.Parent if hasattr(item, "Parent") else ""
+    path_parts = deque((item.VissibleName,))
+    parent_id = getattr(item, "Parent", "")
     while parent_id and parent_id in items_by_id:
         parent = items_by_id[parent_id]
-        path_parts.insert(0, parent.VissibleName)
-        parent_id = parent.Parent if hasattr(parent, "Parent") else ""
+        path_parts.appendleft(parent.VissibleName)
+        parent_id = getattr(parent, "Parent", "")
     return "/" + "/".join(path_parts)
 
 
+def build_path_index(items_by_id: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Build a lookup dict of full paths by item ID.
+
+    Each path is computed once from its parent's path, so shared ancestors
+    are resolved only once instead of once per descendant as with repeated
+    get_item_path() calls.
+    Like index_items(), the result for the last items_by_id dict is reused.
+    """
+    global _path_cache
+
+    cached_items, cached_paths = _path_cache
+    if cached_items is items_by_id:
+        return cached_paths
+
+    paths: Dict[str, str] = {}
+
+    for item in items_by_id.values():
+        # Walk up until reaching a resolved ancestor or the root, then resolve the
+        # chain top-down. Iterative, so deep trees can't hit the recursion limit.
+        chain = []
+        chain_ids = set()
+        prefix = ""
+        while item is not None:
+            item_id = item.ID
+            if item_id in paths:
+                prefix = paths[item_id]
+                break
+            if item_id in chain_ids:
+                # Parent cycle: treat the repeated ancestor as the root
+                break
+            chain.append(item)
+            chain_ids.add(item_id)
+            parent_id = getattr(item, "Parent", "")
+            item = items_by_id.get(parent_id) if parent_id else None
+
+        for item in reversed(chain):
+            prefix = f"{prefix}/{item.VissibleName}"
+            paths[item.ID] = prefix
+
+    _path_cache = (items_by_id, paths)
+    return paths
+
+
 def download_raw_file(client, doc, extension: str):
     """
     Download a raw file (PDF or EPUB) for a document.
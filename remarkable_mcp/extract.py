@@ -2,14 +2,28 @@
 Text extraction helpers for reMarkable documents.
 """
 
+import hashlib
+import heapq
+import io
 import json
 import os
+import random
+import re
 import tempfile
+import threading
 import time
 import zipfile
+from collections import OrderedDict, defaultdict
+from contextlib import nullcontext
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Set, Tuple, Union
+
+try:
+    # Optional: faster parsing of .content and .json sidecar files
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 # reMarkable tablet screen dimensions (in pixels) - used as fallback
 REMARKABLE_WIDTH = 1404
@@ -25,6 +39,21 @@ def get_background_color() -> str:
     return os.environ.get("REMARKABLE_BACKGROUND_COLOR", _DEFAULT_BACKGROUND_COLOR)
 
 
+def get_svg_backend() -> str:
+    """Get the SVG rasterizer: "auto" (default), "resvg", "skia", "cairosvg" or "inkscape"."""
+    return os.environ.get("REMARKABLE_SVG_BACKEND", "auto").lower()
+
+
+def disk_cache_enabled() -> bool:
+    """Whether OCR, render and extraction results are cached on disk (REMARKABLE_DISK_CACHE)."""
+    return os.environ.get("REMARKABLE_DISK_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+
+def get_vision_image_format() -> str:
+    """Get the image format sent to Google Vision: "png" (default) or "jpeg"."""
+    return os.environ.get("REMARKABLE_VISION_IMAGE_FORMAT", "png").lower()
+
+
 # For backwards compatibility, expose as module constant (evaluated at import)
 # Use get_background_color() for runtime evaluation of env var
 REMARKABLE_BACKGROUND_COLOR = get_background_color()
@@ -32,25 +61,176 @@ REMARKABLE_BACKGROUND_COLOR = get_background_color()
 # Margin around content when using content-based bounding box (in pixels)
 CONTENT_MARGIN = 50
 
+# Below this many pages, text is extracted in-process; sending pages to the
+# worker pool and back would cost more than parsing them here
+PARALLEL_TEXT_MIN_PAGES = 8
+
+# Without OCR, text is read straight from the zip. Pages of zips up to this size
+# are loaded into memory and parsed in parallel; larger zips stream page by page
+IN_MEMORY_ZIP_MAX_BYTES = 50 * 1024 * 1024
+
+# Concurrent Google Vision requests per document. The default stays low so
+# default-quota projects aren't throttled with 429s; REMARKABLE_OCR_CONCURRENCY
+# can raise it up to OCR_MAX_WORKERS
+OCR_DEFAULT_CONCURRENCY = 3
+OCR_MAX_WORKERS = 16
+
+# Time budgets per page render and per page OCR (a Vision batch gets one
+# OCR budget per image), so one pathological page can't stall a whole notebook
+RENDER_TIMEOUT_SECONDS = 8
+OCR_TIMEOUT_SECONDS = 20
+
+# Tiered OCR sends pages whose Tesseract text is shorter than this to Vision
+TIERED_MIN_TEXT_CHARS = 10
+
+# Google Vision accepts up to 16 images per request; keep requests under its 10 MB limit
+VISION_BATCH_SIZE = 16
+VISION_BATCH_BYTES = 8 * 1024 * 1024
+
+# Vision requests rejected with these statuses are retried with exponential backoff
+VISION_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+VISION_MAX_RETRIES = 4
+VISION_MAX_BACKOFF_SECONDS = 30
+
+# With REMARKABLE_VISION_IMAGE_FORMAT=jpeg, pages are downscaled and re-encoded
+VISION_JPEG_MAX_EDGE = 1024
+VISION_JPEG_QUALITY = 85
+
+# Worker processes for rmscene parsing and page rendering, shared across calls
+# so documents don't each pay process startup (created on first use)
+_process_pool: Optional[Any] = None
+_process_pool_lock = threading.Lock()
+
+# Threads that run in-process rmc rendering, so a page can be abandoned after
+# RENDER_TIMEOUT_SECONDS (created on first use)
+_render_executor: Optional[Any] = None
+_render_executor_lock = threading.Lock()
+
+# Shared HTTP session for Google Vision REST calls (created on first use)
+_vision_session: Optional[Any] = None
+_vision_session_lock = threading.Lock()
+
+# Patterns used to insert a background rect into rendered SVGs
+_SVG_TAG_RE = re.compile(r"(<svg[^>]*>)", re.IGNORECASE)
+_VIEWBOX_RE = re.compile(r'viewBox="([^"]*)"')
+
 # Cache TTL in seconds (5 minutes)
 CACHE_TTL_SECONDS = 300
 
+# Maximum number of entries kept in each cache; least recently used go first
+EXTRACTION_CACHE_MAX_ENTRIES = 64
+PAGE_OCR_CACHE_MAX_ENTRIES = 1024
+RM_TEXT_CACHE_MAX_ENTRIES = 1024
+
+# Disk cache entries unused for this long are deleted; each cache is also
+# capped in size, evicting least recently used entries (checked at most once
+# per DISK_CACHE_PRUNE_INTERVAL_SECONDS per cache)
+DISK_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+DISK_CACHE_PRUNE_INTERVAL_SECONDS = 60
+
+# Persistent OCR results, keyed by rendered page content, shared across runs
+OCR_DISK_CACHE_DIR = Path.home() / ".remarkable" / "cache" / "ocr"
+OCR_DISK_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Persistent OCR page renders, keyed by .rm content; bump the version when
+# _render_rm_to_png_bytes output changes so stale renders are not reused
+PAGE_RENDER_CACHE_DIR = Path.home() / ".remarkable" / "cache" / "pages"
+PAGE_RENDER_CACHE_VERSION = 2
+PAGE_RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Persistent whole-document extraction results, keyed by zip fingerprint, so a
+# restarted server doesn't redo extraction or OCR for unchanged documents
+EXTRACTION_DISK_CACHE_DIR = Path.home() / ".remarkable" / "cache" / "extractions"
+EXTRACTION_DISK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Keys for the OCR disk cache; change one when its backend's output would change
+VISION_REST_CACHE_KEY = "google-rest:v1:DOCUMENT_TEXT_DETECTION"
+VISION_SDK_CACHE_KEY = "google-sdk:DOCUMENT_TEXT_DETECTION"
+TESSERACT_CONFIG = r"--psm 11 --oem 3"
+
+# Grayscale level below which a pixel counts as ink when binarizing for Tesseract
+TESSERACT_INK_THRESHOLD = 200
+
+
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire CACHE_TTL_SECONDS after being set."""
+
+    def __init__(self, max_entries: int, on_evict: Optional[Callable[[Any], None]] = None):
+        self._entries: OrderedDict = OrderedDict()
+        self._max_entries = max_entries
+        self._on_evict = on_evict
+
+    def get(self, key: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + CACHE_TTL_SECONDS, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            oldest, _ = self._entries.popitem(last=False)
+            if self._on_evict:
+                self._on_evict(oldest)
+
+    def pop(self, key: Any) -> None:
+        if self._entries.pop(key, None) is not None and self._on_evict:
+            self._on_evict(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 # Module-level cache for OCR results (full document)
 # Key: doc_id
-# Value: {"result": extraction_result, "include_ocr": bool, "timestamp": float}
-_extraction_cache: Dict[str, Dict[str, Any]] = {}
+# Value: {"result": extraction_result, "include_ocr": bool, "fingerprint": str}
+_extraction_cache = _TTLCache(EXTRACTION_CACHE_MAX_ENTRIES)
+
+# Per-page cache keys by document, so one document can be cleared without a scan
+_page_keys_by_doc: Dict[str, Set[tuple]] = {}
+
+
+def _forget_page_key(key: tuple) -> None:
+    keys = _page_keys_by_doc.get(key[0])
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _page_keys_by_doc[key[0]]
+
 
 # Per-page cache for sampling OCR results
 # Key: (doc_id, page_number, backend)
-# Value: {"text": str, "timestamp": float}
-_page_ocr_cache: Dict[tuple, Dict[str, Any]] = {}
+# Value: OCR text
+_page_ocr_cache = _TTLCache(PAGE_OCR_CACHE_MAX_ENTRIES, on_evict=_forget_page_key)
+
+
+def _zip_fingerprint(zip_path: Path) -> str:
+    """
+    Fingerprint a document zip from its central directory.
+
+    Uses each member's name, CRC and size, so it is cheap (no decompression)
+    and stable across re-downloads of unchanged content, unlike mtimes.
+    """
+    digest = hashlib.sha1()
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        for info in sorted(zf.infolist(), key=lambda i: i.filename):
+            digest.update(f"{info.filename}:{info.CRC}:{info.file_size};".encode())
+    return digest.hexdigest()
 
 
-def _is_cache_valid(cached: Dict[str, Any]) -> bool:
-    """Check if a cached entry is still valid based on TTL."""
-    if "timestamp" not in cached:
-        return True  # Old cache entries without timestamp are valid
-    return (time.time() - cached["timestamp"]) < CACHE_TTL_SECONDS
+# Typed text per .rm page, keyed by a hash of the page content, so extracting a
+# document again (e.g. adding OCR to a cached text-only result) skips rmscene
+# for pages that haven't changed
+_rm_text_cache = _TTLCache(RM_TEXT_CACHE_MAX_ENTRIES)
 
 
 def clear_extraction_cache(doc_id: Optional[str] = None) -> None:
@@ -62,14 +242,15 @@ def clear_extraction_cache(doc_id: Optional[str] = None) -> None:
                 If None, clear the entire cache.
     """
     if doc_id:
-        _extraction_cache.pop(doc_id, None)
+        _extraction_cache.pop(doc_id)
         # Also clear per-page cache entries for this document
-        keys_to_remove = [k for k in _page_ocr_cache if k[0] == doc_id]
-        for key in keys_to_remove:
-            _page_ocr_cache.pop(key, None)
+        for key in list(_page_keys_by_doc.get(doc_id, ())):
+            _page_ocr_cache.pop(key)
     else:
         _extraction_cache.clear()
         _page_ocr_cache.clear()
+        _page_keys_by_doc.clear()
+        _rm_text_cache.clear()
 
 
 def get_cached_page_ocr(
@@ -88,14 +269,7 @@ def get_cached_page_ocr(
     Returns:
         Cached OCR text or None if not cached/expired
     """
-    cache_key = (doc_id, page, backend)
-    if cache_key in _page_ocr_cache:
-        cached = _page_ocr_cache[cache_key]
-        if _is_cache_valid(cached):
-            return cached["text"]
-        # Expired, remove it
-        _page_ocr_cache.pop(cache_key, None)
-    return None
+    return _page_ocr_cache.get((doc_id, page, backend))
 
 
 def cache_page_ocr(
@@ -114,10 +288,8 @@ def cache_page_ocr(
         text: OCR text result
     """
     cache_key = (doc_id, page, backend)
-    _page_ocr_cache[cache_key] = {
-        "text": text,
-        "timestamp": time.time(),
-    }
+    _page_ocr_cache.set(cache_key, text)
+    _page_keys_by_doc.setdefault(doc_id, set()).add(cache_key)
 
 
 def get_cached_ocr_result(
@@ -137,9 +309,9 @@ def get_cached_ocr_result(
     Returns:
         Cached result dict or None if not cached/expired/wrong backend
     """
-    if doc_id in _extraction_cache:
-        cached = _extraction_cache[doc_id]
-        if (cached["include_ocr"] or not include_ocr) and _is_cache_valid(cached):
+    cached = _extraction_cache.get(doc_id)
+    if cached:
+        if cached["include_ocr"] or not include_ocr:
             # Check backend match if specified
             if ocr_backend is not None:
                 cached_backend = cached["result"].get("ocr_backend")
@@ -163,28 +335,276 @@ def cache_ocr_result(
                 handwritten_text, pages, page_ids, ocr_backend
         include_ocr: Whether this result includes OCR content
     """
-    _extraction_cache[doc_id] = {
-        "result": result,
-        "include_ocr": include_ocr,
-        "timestamp": time.time(),
-    }
+    _extraction_cache.set(
+        doc_id,
+        {
+            "result": result,
+            "include_ocr": include_ocr,
+        },
+    )
+
+
+def _extraction_disk_cache_path(fingerprint: str, ocr_key: str) -> Path:
+    """Path of the disk cache entry for a document's extraction result."""
+    digest = hashlib.sha256(f"{ocr_key}\0{fingerprint}".encode("utf-8")).hexdigest()
+    return EXTRACTION_DISK_CACHE_DIR / digest[:2] / f"{digest}.json"
+
+
+def _extraction_ocr_key(include_ocr: bool) -> str:
+    """
+    Extraction disk-cache key part for the OCR settings a result depends on.
+
+    OCR results are keyed by the backend that would run now and its settings,
+    so e.g. adding a Vision API key doesn't keep serving Tesseract results.
+    """
+    return _ocr_cache_key(_resolve_ocr_backend()) if include_ocr else "text"
+
+
+def get_disk_cached_extraction(fingerprint: str, include_ocr: bool) -> Optional[Dict[str, Any]]:
+    """
+    Look up a document's extraction result in the disk cache.
+
+    A result cached with OCR also satisfies a request without OCR.
+
+    Returns:
+        Cached entry {"result": dict, "include_ocr": bool}, or None if not
+        cached or expired
+    """
+    keys = [_extraction_ocr_key(True)] + ([] if include_ocr else [_extraction_ocr_key(False)])
+    for key in keys:
+        data = _read_disk_cache_file(_extraction_disk_cache_path(fingerprint, key))
+        if data is None:
+            continue
+        try:
+            entry = _json_loads(data)
+            return {"result": entry["result"], "include_ocr": bool(entry["include_ocr"])}
+        except Exception:
+            # Corrupt entries are cache misses
+            pass
+    return None
+
+
+def cache_disk_extraction(fingerprint: str, result: Dict[str, Any], include_ocr: bool) -> None:
+    """
+    Store a document's extraction result in the disk cache.
+
+    Callers skip results where a page failed to render or OCR; OCR results
+    without handwritten text are not stored either, since that can be a
+    transient failure (e.g. OCR not configured yet).
+    """
+    if include_ocr and not result.get("handwritten_text"):
+        return
+    entry = {"result": result, "include_ocr": include_ocr}
+    _write_disk_cache_file(
+        _extraction_disk_cache_path(fingerprint, _extraction_ocr_key(include_ocr)),
+        json.dumps(entry).encode("utf-8"),
+    )
+    _prune_disk_cache(EXTRACTION_DISK_CACHE_DIR, EXTRACTION_DISK_CACHE_MAX_BYTES)
+
+
+def _ocr_disk_cache_path(png_bytes: bytes, backend_key: str) -> Path:
+    """Path of the disk cache entry for a rendered page OCR'd by one backend."""
+    digest = hashlib.sha256(backend_key.encode("utf-8") + b"\0" + png_bytes).hexdigest()
+    return OCR_DISK_CACHE_DIR / digest[:2] / f"{digest}.json"
+
+
+def get_disk_cached_ocr(images: List[bytes], backend_key: str) -> List[Optional[str]]:
+    """
+    Look up OCR text for rendered pages in the disk cache.
+
+    An unchanged page renders to identical PNG bytes, so its OCR text can be
+    reused across runs without calling the backend again.
+
+    Returns:
+        Texts aligned with images, with None for pages that are not cached
+    """
+    texts: List[Optional[str]] = []
+    for png_bytes in images:
+        data = _read_disk_cache_file(_ocr_disk_cache_path(png_bytes, backend_key))
+        text = None
+        try:
+            text = _json_loads(data)["text"] if data is not None else None
+        except Exception:
+            # Corrupt entries are cache misses
+            pass
+        texts.append(text)
+    return texts
+
+
+def cache_disk_ocr(images: List[bytes], texts: List[Optional[str]], backend_key: str) -> None:
+    """
+    Store OCR text for rendered pages in the disk cache.
+
+    Pages without text are not stored, since that can be a transient failure.
+    Writes go to a temp file that is renamed into place, so concurrent
+    servers never read a partial entry.
+    """
+    for png_bytes, text in zip(images, texts):
+        if not text:
+            continue
+        entry = json.dumps({"text": text}).encode("utf-8")
+        _write_disk_cache_file(_ocr_disk_cache_path(png_bytes, backend_key), entry)
+    _prune_disk_cache(OCR_DISK_CACHE_DIR, OCR_DISK_CACHE_MAX_BYTES)
+
+
+def _read_disk_cache_file(path: Path) -> Optional[bytes]:
+    """
+    Read a disk cache entry, or None if it is missing or expired.
+
+    Hits refresh the entry's mtime, which is what expiry and eviction go by.
+    """
+    if not disk_cache_enabled():
+        return None
+    try:
+        if time.time() - path.stat().st_mtime >= DISK_CACHE_TTL_SECONDS:
+            path.unlink(missing_ok=True)
+            return None
+        data = path.read_bytes()
+        os.utime(path)
+        return data
+    except OSError:
+        return None
+
+
+def _write_disk_cache_file(path: Path, data: bytes) -> None:
+    """Write a disk cache entry atomically; failures are ignored."""
+    if not disk_cache_enabled():
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".entry.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    except OSError:
+        # The cache is best-effort (e.g. read-only home directory)
+        pass
+
+
+# When each disk cache directory was last pruned by this process
+_disk_cache_pruned: Dict[Path, float] = {}
+_disk_cache_prune_lock = threading.Lock()
+
+
+def _prune_disk_cache(cache_dir: Path, max_bytes: int) -> None:
+    """
+    Delete expired entries from a disk cache, then least recently used ones
+    until it fits in max_bytes. Runs at most once per prune interval per cache.
+    """
+    now = time.time()
+    with _disk_cache_prune_lock:
+        if now - _disk_cache_pruned.get(cache_dir, 0.0) < DISK_CACHE_PRUNE_INTERVAL_SECONDS:
+            return
+        _disk_cache_pruned[cache_dir] = now
+
+    entries = []
+    total = 0
+    try:
+        for shard in os.scandir(cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                st = entry.stat()
+                if now - st.st_mtime >= DISK_CACHE_TTL_SECONDS:
+                    Path(entry.path).unlink(missing_ok=True)
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    except OSError:
+        # Missing directory, or entries removed by another process meanwhile
+        pass
+
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def _ocr_with_disk_cache(
+    images: List[bytes],
+    backend_key: str,
+    ocr_pages: Callable[[List[bytes]], List[Optional[str]]],
+) -> List[Optional[str]]:
+    """
+    OCR rendered pages, calling ocr_pages only for pages missing from the disk cache.
+
+    Identical pages (e.g. repeated templates) are sent to ocr_pages once.
+
+    Returns:
+        Texts aligned with images
+    """
+    texts = get_disk_cached_ocr(images, backend_key)
+    # dict keeps first-seen order, so ocr_pages still gets pages in page order
+    misses = list(dict.fromkeys(images[i] for i, text in enumerate(texts) if text is None))
+    if misses:
+        fresh = ocr_pages(misses)
+        if not all(fresh):
+            # Like the page cache, treat a page without text as a possible failure
+            _record_ocr_failure()
+        fresh_by_image = dict(zip(misses, fresh))
+        texts = [fresh_by_image.get(png, text) for png, text in zip(images, texts)]
+        cache_disk_ocr(misses, fresh, backend_key)
+    return texts
 
 
 def find_similar_documents(query: str, documents: List, limit: int = 5) -> List[str]:
-    """Find documents with similar names for 'did you mean' suggestions."""
+    """
+    Find documents with similar names for 'did you mean' suggestions.
+
+    Uses rapidfuzz when installed (pip install remarkable-mcp[fuzzy]),
+    otherwise falls back to difflib.
+    """
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        pass
+    else:
+        names = [doc.VissibleName for doc in documents]
+        # WRatio already weights partial matches, so no substring boost is needed
+        matches = process.extract(
+            query,
+            names,
+            scorer=fuzz.WRatio,
+            processor=str.lower,
+            limit=limit,
+            score_cutoff=50,
+        )
+        return [name for name, _score, _index in matches]
+
     query_lower = query.lower()
+    # SequenceMatcher caches details about seq2, so the query goes there once
+    matcher = SequenceMatcher(None)
+    matcher.set_seq2(query_lower)
     scored = []
     for doc in documents:
         name = doc.VissibleName
-        # Use sequence matcher for fuzzy matching
-        ratio = SequenceMatcher(None, query_lower, name.lower()).ratio()
+        name_lower = name.lower()
+        # An exact match gets the best possible score without running the matcher
+        if name_lower == query_lower:
+            scored.append((name, 1.3))
+            continue
+        matcher.set_seq1(name_lower)
         # Boost partial matches
-        if query_lower in name.lower():
-            ratio += 0.3
-        scored.append((name, ratio))
+        if query_lower in name_lower:
+            ratio = matcher.ratio() + 0.3
+        # Cheap upper bounds skip names that cannot score above the cutoff
+        elif matcher.real_quick_ratio() <= 0.3 or matcher.quick_ratio() <= 0.3:
+            continue
+        else:
+            ratio = matcher.ratio()
+        if ratio > 0.3:
+            scored.append((name, ratio))
 
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return [name for name, score in scored[:limit] if score > 0.3]
+    return [name for name, _score in heapq.nlargest(limit, scored, key=lambda x: x[1])]
 
 
 def extract_text_from_pdf(pdf_path: Path) -> str:
@@ -196,14 +616,16 @@ def extract_text_from_pdf(pdf_path: Path) -> str:
     try:
         import fitz  # PyMuPDF
 
-        text_parts = []
+        # Pages are written out as they are read, rather than collected and joined
+        out = io.StringIO()
         with fitz.open(pdf_path) as doc:
             for page_num, page in enumerate(doc, 1):
-                page_text = page.get_text()
-                if page_text.strip():
-                    text_parts.append(f"--- Page {page_num} ---\n{page_text.strip()}")
-
-        return "\n\n".join(text_parts) if text_parts else ""
+                page_text = page.get_text().strip()
+                if page_text:
+                    if out.tell():
+                        out.write("\n\n")
+                    out.write(f"--- Page {page_num} ---\n{page_text}")
+        return out.getvalue()
     except ImportError:
         return ""
     except Exception:
@@ -217,7 +639,6 @@ def extract_text_from_epub(epub_path: Path) -> str:
     Returns the full text content of the EPUB.
     """
     try:
-        from bs4 import BeautifulSoup
         from ebooklib import ITEM_DOCUMENT, epub
 
         book = epub.read_epub(str(epub_path), options={"ignore_ncx": True})
@@ -225,9 +646,7 @@ def extract_text_from_epub(epub_path: Path) -> str:
 
         for item in book.get_items():
             if item.get_type() == ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), "html.parser")
-                # Get text, preserving some structure
-                text = soup.get_text(separator="\n", strip=True)
+                text = _html_to_text(item.get_content())
                 if text:
                     text_parts.append(text)
 
@@ -238,33 +657,54 @@ def extract_text_from_epub(epub_path: Path) -> str:
         return ""
 
 
-def extract_text_from_rm_file(rm_file_path: Path) -> List[str]:
+def _html_to_text(content: bytes) -> str:
+    """
+    Get the text of an (X)HTML document, one stripped string per line.
+
+    Uses lxml (installed with ebooklib) and falls back to BeautifulSoup's
+    pure-Python parser if it is missing.
+    """
+    try:
+        import lxml.html
+        from lxml import etree
+    except ImportError:
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(content, "html.parser").get_text(separator="\n", strip=True)
+
+    try:
+        root = lxml.html.fromstring(content)
+    except etree.ParserError:
+        return ""  # Empty document
+    # Comments, scripts and styles are not part of the readable text
+    etree.strip_elements(root, etree.Comment, "script", "style", with_tail=False)
+    return "\n".join(part for part in (t.strip() for t in root.itertext()) if part)
+
+
+def extract_text_from_rm_file(rm_file_path: Union[Path, BinaryIO]) -> List[str]:
     """
     Extract typed text from a .rm file using rmscene.
 
     This extracts text that was typed via Type Folio or on-screen keyboard.
     Does NOT require OCR - text is stored natively in v6 .rm files.
+    Accepts a path or an open binary file (e.g. a zip member read into BytesIO).
     """
     try:
         from rmscene import read_blocks
-        from rmscene.scene_items import Text
-        from rmscene.scene_tree import SceneTree
-
-        with open(rm_file_path, "rb") as f:
-            tree = SceneTree()
-            for block in read_blocks(f):
-                tree.add_block(block)
+        from rmscene.scene_stream import RootTextBlock
 
         text_lines = []
 
-        # Extract text from the scene tree
-        for item in tree.root.children.values():
-            if hasattr(item, "value") and isinstance(item.value, Text):
-                text_obj = item.value
-                if hasattr(text_obj, "items"):
-                    for text_item in text_obj.items:
-                        if hasattr(text_item, "value") and text_item.value:
-                            text_lines.append(str(text_item.value))
+        # Typed text lives in the root text block; stroke and glyph blocks are
+        # discarded as they stream past instead of being built into a SceneTree.
+        if hasattr(rm_file_path, "read"):
+            f = nullcontext(rm_file_path)
+        else:
+            f = open(rm_file_path, "rb")
+        with f as stream:
+            for block in read_blocks(stream):
+                if isinstance(block, RootTextBlock):
+                    text_lines.extend(_text_lines(block.value))
 
         return text_lines
 
@@ -275,10 +715,106 @@ def extract_text_from_rm_file(rm_file_path: Path) -> List[str]:
         return []
 
 
+def _text_lines(text_obj: Any) -> List[str]:
+    """Join the character runs of an rmscene Text item and split it into lines."""
+    items = text_obj.items
+    runs = items.values() if hasattr(items, "values") else items
+    # Non-string values are formatting markers, not characters
+    text = "".join(run for run in runs if isinstance(run, str))
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def _extract_text_from_rm_files(rm_files: List[Any]) -> List[List[str]]:
+    """
+    Extract typed text from several .rm files, preserving their order.
+
+    Pages seen before (by content) come from a cache; identical pages are
+    parsed once. Accepts paths or BytesIO buffers.
+    """
+    keys: List[Optional[str]] = []
+    misses: Dict[str, Any] = {}
+    texts: Dict[str, List[str]] = {}
+    for rm_file in rm_files:
+        try:
+            data = rm_file.getvalue() if isinstance(rm_file, io.BytesIO) else rm_file.read_bytes()
+        except OSError:
+            keys.append(None)
+            continue
+        key = hashlib.sha256(data).hexdigest()
+        keys.append(key)
+        if key in texts or key in misses:
+            continue
+        cached = _rm_text_cache.get(key)
+        if cached is not None:
+            texts[key] = cached
+        else:
+            misses[key] = rm_file
+
+    for key, text_lines in zip(misses, _parse_rm_files(list(misses.values()))):
+        texts[key] = text_lines
+        _rm_text_cache.set(key, text_lines)
+    return [list(texts[key]) if key is not None else [] for key in keys]
+
+
+def _parse_rm_files(rm_files: List[Any]) -> List[List[str]]:
+    """
+    Parse typed text from several .rm files with rmscene, preserving their order.
+
+    rmscene parsing is CPU-bound, so large notebooks are spread across
+    worker processes. Small ones are parsed in-process.
+    """
+    if len(rm_files) < PARALLEL_TEXT_MIN_PAGES:
+        return [extract_text_from_rm_file(f) for f in rm_files]
+
+    try:
+        workers = min(len(rm_files), os.cpu_count() or 1)
+        # Hand out pages a few at a time so long notebooks don't pay IPC per page
+        chunksize = max(1, len(rm_files) // (workers * 4))
+        pool = _get_process_pool()
+        return list(pool.map(extract_text_from_rm_file, rm_files, chunksize=chunksize))
+    except Exception:
+        # Process pools can be unavailable (e.g. restricted sandboxes)
+        _discard_process_pool()
+        return [extract_text_from_rm_file(f) for f in rm_files]
+
+
+def _get_process_pool() -> Any:
+    """
+    Get the shared worker process pool, sized like _render_workers().
+
+    Workers are started with forkserver (spawn where it is unavailable), since
+    forking this threaded server could copy locks held by other threads.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=_render_workers(os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context(method),
+                )
+    return _process_pool
+
+
+def _discard_process_pool() -> None:
+    """Shut down the shared worker pool (e.g. after a worker died); the next call starts anew."""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 def _parse_hex_color(hex_color: str) -> tuple:
     """Parse a hex color string to RGBA tuple.
 
-    Supports #RRGGBB (RGB) and #RRGGBBAA (RGBA) formats.
+    Supports #RRGGBB (RGB) and #RRGGBBAA (RGBA) formats. Invalid colors
+    fall back to opaque white.
 
     Args:
         hex_color: Hex color string (e.g., "#FFFFFF" or "#FFFFFF80")
@@ -289,23 +825,115 @@ def _parse_hex_color(hex_color: str) -> tuple:
     if not hex_color.startswith("#"):
         return (255, 255, 255, 255)
 
-    hex_str = hex_color.lstrip("#")
-    if len(hex_str) == 6:
-        r, g, b = tuple(int(hex_str[i : i + 2], 16) for i in (0, 2, 4))
-        return (r, g, b, 255)
-    elif len(hex_str) == 8:
-        r, g, b, a = tuple(int(hex_str[i : i + 2], 16) for i in (0, 2, 4, 6))
-        return (r, g, b, a)
+    try:
+        raw = bytes.fromhex(hex_color.lstrip("#"))
+    except ValueError:
+        return (255, 255, 255, 255)
+
+    if len(raw) == 3:
+        return (raw[0], raw[1], raw[2], 255)
+    elif len(raw) == 4:
+        return tuple(raw)
     else:
         return (255, 255, 255, 255)
 
 
-def _get_svg_content_bounds(svg_path: Path) -> Optional[tuple]:
+def _rm_to_svg_bytes(rm_file_path: Path) -> Optional[bytes]:
+    """
+    Convert a .rm file to SVG with rmc, keeping the output in memory.
+
+    rmc is called as a library when it can be imported, which avoids starting
+    a Python interpreter per page. Otherwise the rmc command is run; without
+    -o it writes the SVG to stdout, and older releases that print nothing
+    there are handled by falling back to an output file.
+
+    Raises:
+        subprocess.TimeoutExpired: if rmc takes too long
+        FileNotFoundError: if rmc is not installed
+    """
+    import subprocess
+
+    svg_bytes = _rm_to_svg_bytes_in_process(rm_file_path)
+    if svg_bytes is not None:
+        return svg_bytes
+
+    result = subprocess.run(
+        ["rmc", "-t", "svg", str(rm_file_path)],
+        capture_output=True,
+        timeout=RENDER_TIMEOUT_SECONDS,
+    )
+    if result.returncode != 0:
+        return None
+    if result.stdout:
+        return result.stdout
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        svg_path = Path(tmpdir) / "page.svg"
+        result = subprocess.run(
+            ["rmc", "-t", "svg", "-o", str(svg_path), str(rm_file_path)],
+            capture_output=True,
+            timeout=RENDER_TIMEOUT_SECONDS,
+        )
+        if result.returncode != 0 or not svg_path.exists():
+            return None
+        return svg_path.read_bytes()
+
+
+def _rm_to_svg_bytes_in_process(rm_file_path: Path) -> Optional[bytes]:
+    """
+    Convert a .rm file to SVG with the rmc library; None if it is unavailable or fails.
+
+    Raises:
+        subprocess.TimeoutExpired: if conversion takes longer than RENDER_TIMEOUT_SECONDS
+    """
+    import subprocess
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    try:
+        from rmc.exporters.svg import tree_to_svg
+        from rmscene import read_tree
+    except ImportError:
+        return None
+
+    def convert() -> Optional[bytes]:
+        try:
+            with open(rm_file_path, "rb") as f:
+                tree = read_tree(f)
+            output = io.StringIO()
+            tree_to_svg(tree, output)
+            return output.getvalue().encode("utf-8")
+        except Exception:
+            # Leave unusual files to the rmc command, which reports its own errors
+            return None
+
+    future = _get_render_executor().submit(convert)
+    try:
+        return future.result(timeout=RENDER_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        # The parse can't be interrupted; its thread finishes and the result is dropped
+        raise subprocess.TimeoutExpired("rmc", RENDER_TIMEOUT_SECONDS) from None
+
+
+def _get_render_executor() -> Any:
+    """Get the thread pool that runs in-process rmc rendering."""
+    global _render_executor
+    if _render_executor is None:
+        with _render_executor_lock:
+            if _render_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                _render_executor = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 1, thread_name_prefix="rmc-render"
+                )
+    return _render_executor
+
+
+def _get_svg_content_bounds(svg: Union[Path, bytes]) -> Optional[tuple]:
     """
-    Parse SVG file to get the content bounding box from viewBox.
+    Parse SVG to get the content bounding box from viewBox.
 
     Args:
-        svg_path: Path to the SVG file
+        svg: Path to the SVG file, or the SVG content as bytes
 
     Returns:
         Tuple of (min_x, min_y, width, height) or None if not determinable
@@ -313,8 +941,15 @@ def _get_svg_content_bounds(svg_path: Path) -> Optional[tuple]:
     import xml.etree.ElementTree as ET
 
     try:
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
+        # Only the root element's attributes are needed, so stop at the first
+        # start event instead of building the whole tree of path data.
+        root = None
+        with io.BytesIO(svg) if isinstance(svg, bytes) else open(svg, "rb") as f:
+            for _, elem in ET.iterparse(f, events=("start",)):
+                root = elem
+                break
+        if root is None:
+            return None
 
         # Try to get viewBox attribute
         viewbox = root.get("viewBox")
@@ -343,8 +978,10 @@ def render_rm_file_to_png(
     """
     Render a .rm file to PNG image bytes.
 
-    Uses rmc to convert .rm to SVG, then cairosvg to convert to PNG.
-    The output is sized based on the SVG content bounds with a margin.
+    Uses rmc to convert .rm to SVG, then resvg or Skia (if installed) or
+    cairosvg to convert to PNG, all in memory. REMARKABLE_SVG_BACKEND can force
+    "resvg", "skia", "cairosvg" or "inkscape". The output is sized based on the
+    SVG content bounds with a margin.
 
     Args:
         rm_file_path: Path to the .rm file
@@ -356,30 +993,15 @@ def render_rm_file_to_png(
         PNG image bytes, or None if rendering failed
     """
     import subprocess
-    import tempfile
-
-    tmp_svg_path = None
-    tmp_png_path = None
-    tmp_raw_path = None
 
     try:
-        # Create temp files
-        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp_svg:
-            tmp_svg_path = Path(tmp_svg.name)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_png:
-            tmp_png_path = Path(tmp_png.name)
-
         # Convert .rm to SVG using rmc
-        result = subprocess.run(
-            ["rmc", "-t", "svg", "-o", str(tmp_svg_path), str(rm_file_path)],
-            capture_output=True,
-            timeout=30,
-        )
-        if result.returncode != 0:
+        svg_bytes = _rm_to_svg_bytes(rm_file_path)
+        if not svg_bytes:
             return None
 
         # Get content bounds from SVG
-        bounds = _get_svg_content_bounds(tmp_svg_path)
+        bounds = _get_svg_content_bounds(svg_bytes)
         if bounds:
             # Use content bounds with margin
             _, _, content_width, content_height = bounds
@@ -391,60 +1013,48 @@ def render_rm_file_to_png(
             output_height = REMARKABLE_HEIGHT
 
         # Convert SVG to PNG
+        backend = get_svg_backend()
+        if backend == "inkscape":
+            return _svg_to_png_inkscape(svg_bytes)
+        if backend in ("auto", "resvg"):
+            png_bytes = _svg_to_png_resvg(svg_bytes, output_width, output_height, background_color)
+            if png_bytes is not None:
+                return png_bytes
+        if backend in ("auto", "skia"):
+            png_bytes = _svg_to_png_skia(svg_bytes, output_width, output_height, background_color)
+            if png_bytes is not None:
+                return png_bytes
+
         try:
             import cairosvg
             from PIL import Image as PILImage
-
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_raw:
-                tmp_raw_path = Path(tmp_raw.name)
-
-            # Use cairosvg with background_color if specified
-            cairosvg.svg2png(
-                url=str(tmp_svg_path),
-                write_to=str(tmp_raw_path),
-                output_width=output_width,
-                output_height=output_height,
-                background_color=background_color,
-            )
-
-            # If no background color specified (transparent), return as-is
-            if background_color is None:
-                with open(tmp_raw_path, "rb") as f:
-                    return f.read()
-
-            # If background color specified, ensure it's applied properly
-            img = PILImage.open(tmp_raw_path)
-            if img.mode == "RGBA" and background_color:
-                # Parse hex color (supports #RRGGBB and #RRGGBBAA formats)
-                r, g, b, a = _parse_hex_color(background_color)
-                # Create background and composite foreground on top
-                if a == 255:
-                    # Fully opaque background - convert to RGB
-                    bg = PILImage.new("RGB", img.size, (r, g, b))
-                    bg.paste(img, mask=img.split()[3])
-                    img = bg
-                elif a > 0:
-                    # Semi-transparent or transparent background
-                    bg = PILImage.new("RGBA", img.size, (r, g, b, a))
-                    img = PILImage.alpha_composite(bg, img)
-                # If a == 0 (fully transparent), return as-is
-            img.save(tmp_png_path)
-
-            with open(tmp_png_path, "rb") as f:
-                return f.read()
-
         except ImportError:
-            # Fall back to inkscape
-            result = subprocess.run(
-                ["inkscape", str(tmp_svg_path), "--export-filename", str(tmp_png_path)],
-                capture_output=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
-                return None
+            return _svg_to_png_inkscape(svg_bytes)
+
+        # Use cairosvg with background_color if specified
+        png_bytes = cairosvg.svg2png(
+            bytestring=svg_bytes,
+            output_width=output_width,
+            output_height=output_height,
+            background_color=background_color,
+        )
 
-            with open(tmp_png_path, "rb") as f:
-                return f.read()
+        # If no background color specified (transparent), return as-is
+        if background_color is None:
+            return png_bytes
+
+        # If background color specified, ensure it's applied properly
+        img = PILImage.open(io.BytesIO(png_bytes))
+        if img.mode == "RGBA" and background_color:
+            # Parse hex color (supports #RRGGBB and #RRGGBBAA formats)
+            r, g, b, a = _parse_hex_color(background_color)
+            # Composite foreground on top of the background
+            if a > 0:
+                img = _composite_on_background(img, (r, g, b, a))
+            # If a == 0 (fully transparent), return as-is
+        out = io.BytesIO()
+        img.save(out, format="PNG")
+        return out.getvalue()
 
     except subprocess.TimeoutExpired:
         return None
@@ -453,52 +1063,147 @@ def render_rm_file_to_png(
         return None
     except Exception:
         return None
-    finally:
-        if tmp_svg_path:
-            tmp_svg_path.unlink(missing_ok=True)
-        if tmp_png_path:
-            tmp_png_path.unlink(missing_ok=True)
-        if tmp_raw_path:
-            tmp_raw_path.unlink(missing_ok=True)
 
 
-def render_rm_file_to_svg(
-    rm_file_path: Path, background_color: Optional[str] = None
-) -> Optional[str]:
+def _svg_to_png_resvg(
+    svg_bytes: bytes, width: int, height: int, background_color: Optional[str]
+) -> Optional[bytes]:
     """
-    Render a .rm file to SVG string.
-
-    Uses rmc to convert .rm to SVG, optionally adding a background.
-
-    Args:
-        rm_file_path: Path to the .rm file
-        background_color: Background color (e.g., "#FFFFFF", None for transparent).
-                         Use REMARKABLE_BACKGROUND_COLOR for the standard paper color.
+    Convert SVG to PNG with resvg, which also paints the background color.
 
-    Returns:
-        SVG content as string, or None if rendering failed
+    Returns None if resvg is not installed or fails, so the caller can fall back.
     """
-    import subprocess
-    import tempfile
-
-    tmp_svg_path = None
-
     try:
-        # Create temp file for SVG output
-        with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp_svg:
-            tmp_svg_path = Path(tmp_svg.name)
+        import resvg_py
+    except ImportError:
+        return None
 
-        # Convert .rm to SVG using rmc
-        result = subprocess.run(
-            ["rmc", "-t", "svg", "-o", str(tmp_svg_path), str(rm_file_path)],
-            capture_output=True,
-            timeout=30,
+    try:
+        png = resvg_py.svg_to_bytes(
+            svg_string=svg_bytes.decode(),
+            width=width,
+            height=height,
+            background=background_color,
         )
-        if result.returncode != 0:
-            return None
+        return bytes(png)
+    except Exception:
+        return None
 
-        # Read SVG content
-        svg_content = tmp_svg_path.read_text()
+
+def _svg_to_png_skia(
+    svg_bytes: bytes, width: int, height: int, background_color: Optional[str]
+) -> Optional[bytes]:
+    """
+    Convert SVG to PNG with Skia, on the GPU when an OpenGL context is available.
+
+    Returns None if skia-python is not installed or fails, so the caller can fall back.
+    """
+    try:
+        import skia
+    except ImportError:
+        return None
+
+    try:
+        dom = skia.SVGDOM.MakeFromStream(skia.MemoryStream(svg_bytes))
+        info = skia.ImageInfo.MakeN32Premul(width, height)
+        surface = None
+        context = skia.GrDirectContext.MakeGL()
+        if context is not None:
+            surface = skia.Surface.MakeRenderTarget(context, skia.Budgeted.kNo, info)
+        if surface is None:
+            # No GPU context (e.g. headless server) - rasterize on the CPU
+            surface = skia.Surface.MakeRaster(info)
+
+        canvas = surface.getCanvas()
+        if background_color:
+            canvas.clear(skia.Color(*_parse_hex_color(background_color)))
+        else:
+            canvas.clear(skia.ColorTRANSPARENT)
+
+        # Scale the SVG's own size to the requested output size
+        size = dom.containerSize()
+        if size.width() > 0 and size.height() > 0:
+            canvas.scale(width / size.width(), height / size.height())
+        else:
+            dom.setContainerSize(skia.Size(width, height))
+        dom.render(canvas)
+
+        image = surface.makeImageSnapshot()
+        return bytes(image.encodeToData(skia.EncodedImageFormat.kPNG, 100))
+    except Exception:
+        return None
+
+
+def _composite_on_background(img: Any, rgba: Tuple[int, int, int, int]) -> Any:
+    """
+    Composite an RGBA page render over a solid background color.
+
+    Opaque backgrounds give an RGB image; translucent ones stay RGBA.
+    """
+    from PIL import Image as PILImage
+
+    bg = PILImage.new("RGBA", img.size, rgba)
+    composed = PILImage.alpha_composite(bg, img.convert("RGBA"))
+    return composed.convert("RGB") if rgba[3] == 255 else composed
+
+
+def _svg_to_png_inkscape(svg_bytes: bytes) -> Optional[bytes]:
+    """
+    Convert SVG to PNG with inkscape, for when cairosvg is not installed.
+
+    Inkscape 1.x reads the SVG from stdin and writes the PNG to stdout with
+    --pipe; older releases without it are handled through a temp directory.
+    """
+    import subprocess
+
+    result = subprocess.run(
+        ["inkscape", "--pipe", "--export-type=png", "--export-filename=-"],
+        input=svg_bytes,
+        capture_output=True,
+        timeout=RENDER_TIMEOUT_SECONDS,
+    )
+    if result.returncode == 0 and result.stdout.startswith(b"\x89PNG"):
+        return result.stdout
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        svg_path = Path(tmpdir) / "page.svg"
+        png_path = Path(tmpdir) / "page.png"
+        svg_path.write_bytes(svg_bytes)
+        result = subprocess.run(
+            ["inkscape", str(svg_path), "--export-filename", str(png_path)],
+            capture_output=True,
+            timeout=RENDER_TIMEOUT_SECONDS,
+        )
+        if result.returncode != 0:
+            return None
+        return png_path.read_bytes()
+
+
+def render_rm_file_to_svg(
+    rm_file_path: Path, background_color: Optional[str] = None
+) -> Optional[str]:
+    """
+    Render a .rm file to SVG string.
+
+    Uses rmc to convert .rm to SVG, optionally adding a background.
+
+    Args:
+        rm_file_path: Path to the .rm file
+        background_color: Background color (e.g., "#FFFFFF", None for transparent).
+                         Use REMARKABLE_BACKGROUND_COLOR for the standard paper color.
+
+    Returns:
+        SVG content as string, or None if rendering failed
+    """
+    import subprocess
+
+    try:
+        # Convert .rm to SVG using rmc
+        svg_bytes = _rm_to_svg_bytes(rm_file_path)
+        if not svg_bytes:
+            return None
+
+        svg_content = svg_bytes.decode()
 
         # Add background rectangle if color specified
         if background_color:
@@ -513,9 +1218,6 @@ def render_rm_file_to_svg(
         return None
     except Exception:
         return None
-    finally:
-        if tmp_svg_path:
-            tmp_svg_path.unlink(missing_ok=True)
 
 
 def _add_svg_background(svg_content: str, background_color: str) -> str:
@@ -530,17 +1232,15 @@ def _add_svg_background(svg_content: str, background_color: str) -> str:
     Returns:
         SVG content with background added
     """
-    import re
-
     # Find the opening <svg> tag and its attributes
-    svg_match = re.search(r"(<svg[^>]*>)", svg_content, re.IGNORECASE)
+    svg_match = _SVG_TAG_RE.search(svg_content)
     if not svg_match:
         return svg_content
 
     svg_tag = svg_match.group(1)
 
     # Extract viewBox or width/height for the background rect dimensions
-    viewbox_match = re.search(r'viewBox="([^"]*)"', svg_tag)
+    viewbox_match = _VIEWBOX_RE.search(svg_tag)
     if viewbox_match:
         viewbox = viewbox_match.group(1)
         parts = viewbox.split()
@@ -562,54 +1262,91 @@ def _add_svg_background(svg_content: str, background_color: str) -> str:
     return svg_content[:insert_pos] + bg_rect + svg_content[insert_pos:]
 
 
-def _get_ordered_rm_files(tmpdir_path: Path) -> List[Path]:
+def _group_files_by_ext(root_path: Path) -> Dict[str, List[Path]]:
+    """Walk a directory tree once and group its files by extension."""
+    files_by_ext: Dict[str, List[Path]] = defaultdict(list)
+    for root, _, filenames in os.walk(root_path):
+        for filename in filenames:
+            files_by_ext[os.path.splitext(filename)[1]].append(Path(root) / filename)
+    return files_by_ext
+
+
+def _get_ordered_rm_files(
+    tmpdir_path: Path, files_by_ext: Optional[Dict[str, List[Path]]] = None
+) -> Tuple[List[Path], List[str]]:
     """Extract and order .rm files from an extracted document directory.
 
-    Reads the .content file to determine page order and returns .rm files
-    sorted accordingly. Falls back to filesystem order if no page order found.
+    Reads the top-level .content file to determine page order and returns .rm
+    files sorted accordingly. Falls back to filesystem order if no page order found.
 
     Args:
         tmpdir_path: Path to the extracted document directory
+        files_by_ext: Files already grouped by _group_files_by_ext(), to skip the walk
 
     Returns:
-        List of .rm file paths in correct page order
+        Tuple of (.rm file paths in page order, page IDs in order). Page IDs are
+        empty when the document has no page order.
     """
-    # Get page order from .content file
-    page_order = []
-    for content_file in tmpdir_path.glob("*.content"):
-        try:
-            data = json.loads(content_file.read_text())
-            # New format: cPages.pages array
-            if "cPages" in data and "pages" in data["cPages"]:
-                page_order = [p["id"] for p in data["cPages"]["pages"]]
-            # Fallback: pages array directly
-            elif "pages" in data and isinstance(data["pages"], list):
-                page_order = data["pages"]
-        except Exception:
-            # Ignore errors reading/parsing .content file; fallback to default page order
-            pass
-        break
+    if files_by_ext is None:
+        files_by_ext = _group_files_by_ext(tmpdir_path)
+
+    page_order: List[str] = []
+    for content_file in files_by_ext.get(".content", ()):
+        if content_file.parent == tmpdir_path:
+            page_order = _read_page_order(content_file.read_bytes())
+            break
+
+    rm_files = _sort_by_page_order(files_by_ext.get(".rm", []), page_order)
+    page_ids = [f.stem for f in rm_files] if page_order else []
+    return rm_files, page_ids
+
+
+def _read_page_order(content: bytes) -> List[str]:
+    """Read the page ID order from the raw contents of a .content file."""
+    try:
+        data = _json_loads(content)
+        # New format: cPages.pages array
+        if "cPages" in data and "pages" in data["cPages"]:
+            return [p["id"] for p in data["cPages"]["pages"]]
+        # Fallback: pages array directly
+        if "pages" in data and isinstance(data["pages"], list):
+            return data["pages"]
+    except Exception:
+        # Ignore errors reading/parsing .content file; fallback to default page order
+        pass
+    return []
+
+
+def _sort_by_page_order(rm_files: List[Any], page_order: List[str]) -> List[Any]:
+    """Order .rm paths or zip member names by page ID, keeping unlisted files at the end."""
+    if not page_order:
+        return rm_files
 
-    rm_files = list(tmpdir_path.glob("**/*.rm"))
+    rm_by_id = {Path(rm_file).stem: rm_file for rm_file in rm_files}
+    ordered = [rm_by_id[page_id] for page_id in page_order if page_id in rm_by_id]
+    # Add any remaining files not in page order
+    seen = set(page_order)
+    ordered.extend(rm_file for rm_file in rm_files if Path(rm_file).stem not in seen)
+    return ordered
 
-    # Sort rm_files by page order if available
-    if page_order:
-        rm_by_id = {}
-        for rm_file in rm_files:
-            page_id = rm_file.stem
-            rm_by_id[page_id] = rm_file
 
-        ordered_rm_files = []
-        for page_id in page_order:
-            if page_id in rm_by_id:
-                ordered_rm_files.append(rm_by_id[page_id])
-        # Add any remaining files not in page order
-        for rm_file in rm_files:
-            if rm_file not in ordered_rm_files:
-                ordered_rm_files.append(rm_file)
-        return ordered_rm_files
+def _read_page_order_from_zip(zf: zipfile.ZipFile) -> List[str]:
+    """Read the page ID order from the top-level .content file in a document zip."""
+    for name in zf.namelist():
+        if name.endswith(".content") and "/" not in name:
+            return _read_page_order(zf.read(name))
+    return []
 
-    return rm_files
+
+def _get_ordered_rm_names(zf: zipfile.ZipFile) -> List[str]:
+    """Get the .rm member names of a document zip in page order, without extracting."""
+    rm_names = [name for name in zf.namelist() if name.endswith(".rm")]
+    return _sort_by_page_order(rm_names, _read_page_order_from_zip(zf))
+
+
+# Members of a document zip that text extraction with OCR writes to disk;
+# embedded PDFs, EPUBs and thumbnails stay in the zip
+EXTRACTED_DOCUMENT_EXTENSIONS = frozenset({".rm", ".content", ".json", ".txt", ".md"})
 
 
 def render_page_from_document_zip_svg(
@@ -628,19 +1365,16 @@ def render_page_from_document_zip_svg(
         SVG content as string, or None if rendering failed or page doesn't exist
     """
     with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir_path = Path(tmpdir)
-
         with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(tmpdir_path)
+            rm_names = _get_ordered_rm_names(zf)
 
-        rm_files = _get_ordered_rm_files(tmpdir_path)
+            # Validate page number
+            if page < 1 or page > len(rm_names):
+                return None
 
-        # Validate page number
-        if page < 1 or page > len(rm_files):
-            return None
+            # Extract only the requested page
+            target_rm_file = Path(zf.extract(rm_names[page - 1], tmpdir))
 
-        # Render the requested page
-        target_rm_file = rm_files[page - 1]
         return render_rm_file_to_svg(target_rm_file, background_color=background_color)
 
 
@@ -660,19 +1394,16 @@ def render_page_from_document_zip(
         PNG image bytes, or None if rendering failed or page doesn't exist
     """
     with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir_path = Path(tmpdir)
-
         with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(tmpdir_path)
+            rm_names = _get_ordered_rm_names(zf)
 
-        rm_files = _get_ordered_rm_files(tmpdir_path)
+            # Validate page number
+            if page < 1 or page > len(rm_names):
+                return None
 
-        # Validate page number
-        if page < 1 or page > len(rm_files):
-            return None
+            # Extract only the requested page
+            target_rm_file = Path(zf.extract(rm_names[page - 1], tmpdir))
 
-        # Render the requested page
-        target_rm_file = rm_files[page - 1]
         return render_rm_file_to_png(target_rm_file, background_color=background_color)
 
 
@@ -686,13 +1417,9 @@ def get_document_page_count(zip_path: Path) -> int:
     Returns:
         Number of pages (0 if unable to determine)
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir_path = Path(tmpdir)
-
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(tmpdir_path)
-
-        return len(list(tmpdir_path.glob("**/*.rm")))
+    # Only the central directory is needed; nothing is decompressed
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        return sum(1 for name in zf.namelist() if name.endswith(".rm"))
 
 
 def extract_text_from_document_zip(
@@ -717,13 +1444,22 @@ def extract_text_from_document_zip(
         }
     """
     # Check cache if doc_id provided
-    if doc_id and doc_id in _extraction_cache:
-        cached = _extraction_cache[doc_id]
-        # Return cached result if OCR requirement is satisfied and cache is valid
+    fingerprint = _zip_fingerprint(zip_path) if doc_id else None
+    cached = _extraction_cache.get(doc_id) if doc_id else None
+    if cached:
+        # Return cached result if OCR requirement is satisfied and the zip
+        # content hasn't changed since it was cached
         # (cached with OCR can satisfy no-OCR request, but not vice versa)
-        if (cached["include_ocr"] or not include_ocr) and _is_cache_valid(cached):
+        if (cached["include_ocr"] or not include_ocr) and cached.get(
+            "fingerprint", fingerprint
+        ) == fingerprint:
             return cached["result"]
 
+    disk_cached = get_disk_cached_extraction(fingerprint, include_ocr) if fingerprint else None
+    if disk_cached is not None:
+        _extraction_cache.set(doc_id, {**disk_cached, "fingerprint": fingerprint})
+        return disk_cached["result"]
+
     result: Dict[str, Any] = {
         "typed_text": [],
         "highlights": [],
@@ -733,113 +1469,144 @@ def extract_text_from_document_zip(
         "ocr_backend": None,
     }
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir_path = Path(tmpdir)
+    # Without OCR, nothing needs to be on disk, so the zip is never extracted
+    complete = True
+    if not include_ocr:
+        _extract_text_from_zip(zip_path, result)
+    else:
+        complete = _extract_text_from_disk(zip_path, result, include_ocr)
 
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(tmpdir_path)
+    # Cache result if doc_id provided
+    if doc_id:
+        _extraction_cache.set(
+            doc_id,
+            {
+                "result": result,
+                "include_ocr": include_ocr,
+                "fingerprint": fingerprint,
+            },
+        )
+        # Partial results (a page failed to render or OCR) are kept only in memory
+        if complete:
+            cache_disk_extraction(fingerprint, result, include_ocr)
 
-        # Get page order from .content file
-        page_order = []
-        for content_file in tmpdir_path.glob("*.content"):
-            try:
-                data = json.loads(content_file.read_text())
-                # New format: cPages.pages array
-                if "cPages" in data and "pages" in data["cPages"]:
-                    page_order = [p["id"] for p in data["cPages"]["pages"]]
-                # Fallback: pages array directly
-                elif "pages" in data and isinstance(data["pages"], list):
-                    page_order = data["pages"]
-            except Exception:
-                # Malformed .content file - continue without page order
-                pass
-            break  # Only process first .content file
+    return result
 
-        rm_files = list(tmpdir_path.glob("**/*.rm"))
 
-        # If we have page order, sort rm_files accordingly
-        if page_order:
-            # Create mapping of page_id -> rm_file
-            rm_by_id = {}
-            for rm_file in rm_files:
-                page_id = rm_file.stem  # filename without extension
-                rm_by_id[page_id] = rm_file
-
-            # Sort rm_files by page order
-            ordered_rm_files = []
-            for page_id in page_order:
-                if page_id in rm_by_id:
-                    ordered_rm_files.append(rm_by_id[page_id])
-            # Add any remaining files not in page order
-            for rm_file in rm_files:
-                if rm_file not in ordered_rm_files:
-                    ordered_rm_files.append(rm_file)
-            rm_files = ordered_rm_files
-            result["page_ids"] = [f.stem for f in rm_files]
+def _extract_text_from_disk(zip_path: Path, result: Dict[str, Any], include_ocr: bool) -> bool:
+    """
+    Fill an extraction result from a document extracted to a temporary directory.
+
+    Only .rm pages and text sidecars are written out.
 
+    Returns:
+        False if a page failed to render or OCR, so the result is incomplete
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        files_by_ext: Dict[str, List[Path]] = defaultdict(list)
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            for name in zf.namelist():
+                ext = os.path.splitext(name)[1]
+                if ext in EXTRACTED_DOCUMENT_EXTENSIONS:
+                    files_by_ext[ext].append(Path(zf.extract(name, tmpdir_path)))
+
+        rm_files, page_ids = _get_ordered_rm_files(tmpdir_path, files_by_ext)
+        result["page_ids"] = page_ids
         result["pages"] = len(rm_files)
 
         # Extract typed text from .rm files using rmscene
-        for rm_file in rm_files:
-            text_lines = extract_text_from_rm_file(rm_file)
+        for text_lines in _extract_text_from_rm_files(rm_files):
             result["typed_text"].extend(text_lines)
 
-        # Extract text from .txt and .md files
-        for txt_file in tmpdir_path.glob("**/*.txt"):
-            try:
-                content = txt_file.read_text(errors="ignore")
-                if content.strip():
-                    result["typed_text"].append(content)
-            except Exception:
-                # File read failed - skip this file and continue
-                pass
-
-        for md_file in tmpdir_path.glob("**/*.md"):
-            try:
-                content = md_file.read_text(errors="ignore")
-                if content.strip():
-                    result["typed_text"].append(content)
-            except Exception:
-                # File read failed - skip this file and continue
-                pass
-
-        # Extract from .content files (metadata with text)
-        for content_file in tmpdir_path.glob("**/*.content"):
-            try:
-                data = json.loads(content_file.read_text())
-                if "text" in data:
-                    result["typed_text"].append(data["text"])
-            except Exception:
-                # Malformed JSON or read error - skip this file
-                pass
-
-        # Extract PDF highlights
-        for json_file in tmpdir_path.glob("**/*.json"):
-            try:
-                data = json.loads(json_file.read_text())
-                if isinstance(data, dict) and "highlights" in data:
-                    for h in data.get("highlights", []):
-                        if "text" in h and h["text"]:
-                            result["highlights"].append(h["text"])
-            except Exception:
-                # Malformed JSON - skip this file
-                pass
+        _add_sidecar_text(result, files_by_ext, Path.read_bytes)
 
         # OCR for handwritten content (optional)
         if include_ocr and rm_files:
+            _reset_ocr_failures()
             ocr_result, ocr_backend = extract_handwriting_ocr(rm_files)
             result["handwritten_text"] = ocr_result
             result["ocr_backend"] = ocr_backend
+            return not _had_ocr_failures()
+    return True
 
-    # Cache result if doc_id provided
-    if doc_id:
-        _extraction_cache[doc_id] = {
-            "result": result,
-            "include_ocr": include_ocr,
-            "timestamp": time.time(),
-        }
 
-    return result
+def _extract_text_from_zip(zip_path: Path, result: Dict[str, Any]) -> None:
+    """Fill an extraction result by reading zip members directly, without extracting."""
+    stream = zip_path.stat().st_size > IN_MEMORY_ZIP_MAX_BYTES
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        files_by_ext: Dict[str, List[str]] = defaultdict(list)
+        for name in zf.namelist():
+            files_by_ext[os.path.splitext(name)[1]].append(name)
+
+        page_order = _read_page_order_from_zip(zf)
+        rm_names = _sort_by_page_order(files_by_ext[".rm"], page_order)
+        if page_order:
+            result["page_ids"] = [Path(name).stem for name in rm_names]
+        result["pages"] = len(rm_names)
+
+        # Extract typed text from .rm files using rmscene
+        if stream:
+            # Large notebooks: only one page is held in memory at a time
+            for name in rm_names:
+                (text_lines,) = _extract_text_from_rm_files([io.BytesIO(zf.read(name))])
+                result["typed_text"].extend(text_lines)
+        else:
+            rm_streams = [io.BytesIO(zf.read(name)) for name in rm_names]
+            for text_lines in _extract_text_from_rm_files(rm_streams):
+                result["typed_text"].extend(text_lines)
+
+        _add_sidecar_text(result, files_by_ext, zf.read)
+
+
+def _add_sidecar_text(
+    result: Dict[str, Any], files_by_ext: Dict[str, List[Any]], read: Callable[[Any], bytes]
+) -> None:
+    """Add text from .txt/.md/.content files and PDF highlights from .json files."""
+    # Extract text from .txt and .md files
+    for txt_file in files_by_ext[".txt"]:
+        try:
+            content = read(txt_file).decode(errors="ignore")
+            if content.strip():
+                result["typed_text"].append(content)
+        except Exception:
+            # File read failed - skip this file and continue
+            pass
+
+    for md_file in files_by_ext[".md"]:
+        try:
+            content = read(md_file).decode(errors="ignore")
+            if content.strip():
+                result["typed_text"].append(content)
+        except Exception:
+            # File read failed - skip this file and continue
+            pass
+
+    # Extract from .content files (metadata with text)
+    for content_file in files_by_ext[".content"]:
+        try:
+            data = _json_loads(read(content_file))
+            if "text" in data:
+                result["typed_text"].append(data["text"])
+        except Exception:
+            # Malformed JSON or read error - skip this file
+            pass
+
+    # Extract PDF highlights
+    for json_file in files_by_ext[".json"]:
+        try:
+            raw = read(json_file)
+            # Most .json files are page metadata; skip parsing those entirely
+            if b'"highlights"' not in raw:
+                continue
+            data = _json_loads(raw)
+            if isinstance(data, dict) and "highlights" in data:
+                for h in data.get("highlights", []):
+                    if "text" in h and h["text"]:
+                        result["highlights"].append(h["text"])
+        except Exception:
+            # Malformed JSON - skip this file
+            pass
 
 
 def extract_handwriting_ocr(rm_files: List[Path]) -> tuple[Optional[List[str]], Optional[str]]:
@@ -850,6 +1617,8 @@ def extract_handwriting_ocr(rm_files: List[Path]) -> tuple[Optional[List[str]],
     - "sampling": Uses client's LLM via MCP sampling (requires async context, tools only)
     - "google": Google Cloud Vision - best for handwriting
     - "tesseract": pytesseract - basic OCR, requires rmc + cairosvg
+    - "tiered": Tesseract first, Google Vision (API key) only for pages it
+      reads with low confidence
     - "auto" (default): Google if API key provided, else Tesseract
 
     Note: "sampling" backend requires async context and is only available via tools,
@@ -857,10 +1626,24 @@ def extract_handwriting_ocr(rm_files: List[Path]) -> tuple[Optional[List[str]],
     (e.g., from resources), it falls back to the auto-detection logic.
 
     Returns:
-        Tuple of (ocr_results, backend_used) where backend_used is "google" or "tesseract"
+        Tuple of (ocr_results, backend_used) where backend_used is "google",
+        "tesseract" or "tiered"
     """
-    import os
+    backend = _resolve_ocr_backend()
+
+    if backend == "google":
+        result = _ocr_google_vision(rm_files)
+        return (result, "google")
+    elif backend == "tiered":
+        result = _ocr_tiered(rm_files)
+        return (result, "tiered")
+    else:
+        result = _ocr_tesseract(rm_files)
+        return (result, "tesseract")
 
+
+def _resolve_ocr_backend() -> str:
+    """The backend extract_handwriting_ocr() uses: "google", "tiered" or "tesseract"."""
     backend = os.environ.get("REMARKABLE_OCR_BACKEND", "auto").lower()
 
     # Sampling backend requires async context - can't be used from sync functions
@@ -876,12 +1659,36 @@ def extract_handwriting_ocr(rm_files: List[Path]) -> tuple[Optional[List[str]],
         else:
             backend = "tesseract"
 
+    return backend if backend in ("google", "tiered") else "tesseract"
+
+
+def _ocr_cache_key(backend: str) -> str:
+    """OCR disk-cache key for a resolved backend and the settings its output depends on."""
+    api_key = os.environ.get("GOOGLE_VISION_API_KEY")
     if backend == "google":
-        result = _ocr_google_vision(rm_files)
-        return (result, "google")
-    else:
-        result = _ocr_tesseract(rm_files)
-        return (result, "tesseract")
+        return _vision_cache_key(VISION_REST_CACHE_KEY if api_key else VISION_SDK_CACHE_KEY)
+    if backend == "tiered":
+        # Results differ with and without Vision escalation, so cache them separately
+        escalation = _vision_cache_key(VISION_REST_CACHE_KEY) if api_key else "none"
+        return f"tiered:{_ocr_confidence_threshold()}:{TESSERACT_CONFIG}:{escalation}"
+    return f"tesseract:{TESSERACT_CONFIG}:{TESSERACT_INK_THRESHOLD}"
+
+
+# Whether a page failed to render or OCR in this thread since the last
+# _reset_ocr_failures(), so partial document results are not persisted
+_ocr_failures = threading.local()
+
+
+def _reset_ocr_failures() -> None:
+    _ocr_failures.seen = False
+
+
+def _record_ocr_failure() -> None:
+    _ocr_failures.seen = True
+
+
+def _had_ocr_failures() -> bool:
+    return getattr(_ocr_failures, "seen", False)
 
 
 def _ocr_google_vision(rm_files: List[Path]) -> Optional[List[str]]:
@@ -905,222 +1712,484 @@ def _ocr_google_vision(rm_files: List[Path]) -> Optional[List[str]]:
         return _ocr_google_vision_sdk(rm_files)
 
 
-def _ocr_google_vision_rest(rm_files: List[Path], api_key: str) -> Optional[List[str]]:
+def _render_workers(page_count: int) -> int:
+    """Number of worker processes for rendering pages (REMARKABLE_RENDER_WORKERS caps it)."""
+    try:
+        limit = int(os.environ.get("REMARKABLE_RENDER_WORKERS", ""))
+    except ValueError:
+        limit = os.cpu_count() or 1
+    return max(1, min(page_count, limit))
+
+
+def _vision_workers(batch_count: int) -> int:
+    """Number of concurrent Vision requests (REMARKABLE_OCR_CONCURRENCY sets the limit)."""
+    try:
+        limit = int(os.environ.get("REMARKABLE_OCR_CONCURRENCY", ""))
+    except ValueError:
+        limit = OCR_DEFAULT_CONCURRENCY
+    return max(1, min(batch_count, limit, OCR_MAX_WORKERS))
+
+
+# Drawing elements rmc emits for strokes and typed text
+_SVG_DRAWING_TAGS = (b"<path", b"<polyline", b"<text")
+
+# SVGs smaller than this with few drawing elements are treated as blank pages
+BLANK_SVG_MAX_BYTES = 2048
+
+
+def _is_blank_svg(svg_bytes: bytes) -> bool:
     """
-    OCR using Google Cloud Vision REST API with API key.
+    Whether a rendered page has too little on it to be worth OCR.
+
+    A page with fewer than REMARKABLE_BLANK_PATH_THRESHOLD drawing elements
+    (default 3) and a tiny SVG is a divider or an empty back page.
+    """
+    try:
+        threshold = int(os.environ.get("REMARKABLE_BLANK_PATH_THRESHOLD", "3"))
+    except ValueError:
+        threshold = 3
+    if len(svg_bytes) >= BLANK_SVG_MAX_BYTES:
+        return False
+    return sum(svg_bytes.count(tag) for tag in _SVG_DRAWING_TAGS) < threshold
+
+
+def _render_rm_to_png_bytes(
+    rm_file: Path, width: int = REMARKABLE_WIDTH, height: int = REMARKABLE_HEIGHT
+) -> Optional[bytes]:
+    """
+    Render a .rm page to a fixed-size grayscale PNG on a white background, for OCR.
+
+    Module-level so it can run in a worker process. Returns b"" if the page is
+    blank and None if it could not be rendered; raises FileNotFoundError if
+    rmc is not installed.
     """
-    import base64
     import subprocess
-    import tempfile
 
-    import requests
+    try:
+        # Convert .rm to SVG using rmc
+        svg_bytes = _rm_to_svg_bytes(rm_file)
+        if not svg_bytes:
+            return None
+        if _is_blank_svg(svg_bytes):
+            return b""
 
-    ocr_results = []
+        try:
+            import cairosvg
+            from PIL import Image as PILImage
+        except ImportError:
+            return _svg_to_png_inkscape(svg_bytes)
+
+        # Convert to PNG (comes out with transparent background)
+        png_bytes = cairosvg.svg2png(bytestring=svg_bytes, output_width=width, output_height=height)
+        # Drop each stage's buffer once it is consumed, so a worker doesn't hold
+        # the SVG and raw render alongside the decoded page
+        del svg_bytes
+
+        # Strokes are drawn on a transparent page: blend their grayscale onto
+        # white by alpha, so light strokes (white pen, highlighter) stay light
+        with PILImage.open(io.BytesIO(png_bytes)) as raw:
+            del png_bytes
+            if raw.mode == "RGBA":
+                img = _white_page(raw.size)
+                img.paste(raw.convert("L"), mask=raw.getchannel("A"))
+            else:
+                img = raw.convert("L")
+        out = io.BytesIO()
+        img.save(out, format="PNG")
+        return out.getvalue()
 
+    except subprocess.TimeoutExpired:
+        # Page rendering timed out - skip this page
+        return None
+    except FileNotFoundError:
+        # rmc not installed - no page can be rendered
+        raise
+    except Exception:
+        return None
+
+
+# Each rendering thread keeps one white page and clears it between pages, so
+# pages of the same size don't each allocate a new background
+_white_page_local = threading.local()
+
+
+def _white_page(size: Tuple[int, int]) -> Any:
+    """Get this thread's white grayscale page of the given size, cleared for reuse."""
+    from PIL import Image as PILImage
+
+    page = getattr(_white_page_local, "page", None)
+    if page is None or page.size != size:
+        page = PILImage.new("L", size, 255)
+        _white_page_local.page = page
+    else:
+        page.paste(255, (0, 0, *size))
+    return page
+
+
+def _render_pages_for_ocr(
+    rm_files: List[Path], width: int = REMARKABLE_WIDTH, height: int = REMARKABLE_HEIGHT
+) -> List[Optional[bytes]]:
+    """
+    Render pages to PNG for OCR, in page order; b"" marks a blank page and
+    None a page that failed to render.
+
+    Synced .rm files don't change, so renders are kept on disk keyed by the
+    page content and only new or edited pages are rendered again. Pages with
+    identical content are rendered once.
+    Raises FileNotFoundError if rmc is not installed.
+    """
+    images: List[Optional[bytes]] = []
+    cache_paths: List[Optional[Path]] = []
     for rm_file in rm_files:
-        tmp_svg_path = None
-        tmp_png_path = None
-        tmp_raw_path = None
+        path = _page_render_cache_path(rm_file, width, height)
+        images.append(_read_disk_cache_file(path) if path is not None else None)
+        cache_paths.append(path)
+
+    # Identical pages (blank or duplicated) share a cache path; render each once
+    missing: Dict[Any, List[int]] = {}
+    for i, png_bytes in enumerate(images):
+        if png_bytes is None:
+            missing.setdefault(cache_paths[i] or i, []).append(i)
+    if missing:
+        groups = list(missing.values())
+        rendered = _render_pages_uncached([rm_files[g[0]] for g in groups], width, height)
+        for group, png_bytes in zip(groups, rendered):
+            if png_bytes is None:
+                _record_ocr_failure()
+            for i in group:
+                images[i] = png_bytes
+            path = cache_paths[group[0]]
+            if png_bytes and path is not None:
+                _write_disk_cache_file(path, png_bytes)
+        _prune_disk_cache(PAGE_RENDER_CACHE_DIR, PAGE_RENDER_CACHE_MAX_BYTES)
+    return images
+
+
+def _page_render_cache_path(rm_file: Path, width: int, height: int) -> Optional[Path]:
+    """Path of the disk cache entry for a page render, or None if the page can't be read."""
+    try:
+        rm_bytes = Path(rm_file).read_bytes()
+    except OSError:
+        return None
+    key = f"{PAGE_RENDER_CACHE_VERSION}:{width}x{height}".encode("utf-8")
+    digest = hashlib.sha256(key + b"\0" + rm_bytes).hexdigest()
+    return PAGE_RENDER_CACHE_DIR / digest[:2] / f"{digest}.png"
+
+
+def _render_pages_uncached(rm_files: List[Path], width: int, height: int) -> List[Optional[bytes]]:
+    """
+    Render pages to PNG for OCR, in page order, without the disk cache.
+
+    rmc and cairosvg are CPU-bound per page, so pages are spread across worker
+    processes. Raises FileNotFoundError if rmc is not installed.
+    """
+    if _render_workers(len(rm_files)) > 1:
         try:
-            # Create temp files
-            with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp_svg:
-                tmp_svg_path = Path(tmp_svg.name)
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_png:
-                tmp_png_path = Path(tmp_png.name)
-
-            # Convert .rm to SVG using rmc
-            result = subprocess.run(
-                ["rmc", "-t", "svg", "-o", str(tmp_svg_path), str(rm_file)],
-                capture_output=True,
-                timeout=30,
+            return list(
+                _get_process_pool().map(
+                    _render_rm_to_png_bytes,
+                    rm_files,
+                    [width] * len(rm_files),
+                    [height] * len(rm_files),
+                )
             )
-            if result.returncode != 0:
-                continue
+        except FileNotFoundError:
+            raise
+        except Exception:
+            # Process pools can be unavailable (e.g. restricted sandboxes)
+            _discard_process_pool()
+    return [_render_rm_to_png_bytes(f, width, height) for f in rm_files]
 
-            # Convert SVG to PNG
-            try:
-                import cairosvg
-                from PIL import Image as PILImage
 
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_raw:
-                    tmp_raw_path = Path(tmp_raw.name)
+def _ocr_google_vision_rest(rm_files: List[Path], api_key: str) -> Optional[List[str]]:
+    """
+    OCR using Google Cloud Vision REST API with API key.
 
-                cairosvg.svg2png(
-                    url=str(tmp_svg_path),
-                    write_to=str(tmp_raw_path),
-                    output_width=REMARKABLE_WIDTH,
-                    output_height=REMARKABLE_HEIGHT,
-                )
+    Pages are rendered in parallel, then sent in batches of up to VISION_BATCH_SIZE
+    images per request, with batches sent concurrently.
+    """
+    try:
+        images = [png for png in _render_pages_for_ocr(rm_files) if png]
+    except FileNotFoundError:
+        return None
+    if not images:
+        return None
 
-                # Add white background
-                img = PILImage.open(tmp_raw_path)
-                if img.mode == "RGBA":
-                    bg = PILImage.new("RGB", img.size, (255, 255, 255))
-                    bg.paste(img, mask=img.split()[3])
-                    img = bg
-                img.save(tmp_png_path)
-                tmp_raw_path.unlink(missing_ok=True)
-                tmp_raw_path = None
-            except ImportError:
-                result = subprocess.run(
-                    ["inkscape", str(tmp_svg_path), "--export-filename", str(tmp_png_path)],
-                    capture_output=True,
-                    timeout=30,
-                )
-                if result.returncode != 0:
-                    continue
+    statuses: List[Optional[int]] = []
 
-            # Read and encode image
-            with open(tmp_png_path, "rb") as f:
-                image_content = base64.b64encode(f.read()).decode("utf-8")
-
-            # Call Google Vision REST API
-            url = f"https://vision.googleapis.com/v1/images:annotate?key={api_key}"
-            payload = {
-                "requests": [
-                    {
-                        "image": {"content": image_content},
-                        "features": [{"type": "DOCUMENT_TEXT_DETECTION"}],
-                    }
-                ]
-            }
-
-            response = requests.post(url, json=payload, timeout=60)
-            if response.status_code == 200:
-                data = response.json()
-                if "responses" in data and data["responses"]:
-                    resp = data["responses"][0]
-                    if "fullTextAnnotation" in resp:
-                        text = resp["fullTextAnnotation"]["text"]
-                        if text.strip():
-                            ocr_results.append(text.strip())
-            elif response.status_code in (401, 403):
-                # API key invalid or API not enabled - fall back to Tesseract
-                return _ocr_tesseract(rm_files)
-
-        except subprocess.TimeoutExpired:
-            # Page rendering timed out - skip this page and continue
-            pass
-        except FileNotFoundError:
-            return None
-        except Exception:
-            # API call or rendering failed - skip this page and continue
-            pass
-        finally:
-            if tmp_svg_path:
-                tmp_svg_path.unlink(missing_ok=True)
-            if tmp_png_path:
-                tmp_png_path.unlink(missing_ok=True)
-            if tmp_raw_path:
-                tmp_raw_path.unlink(missing_ok=True)
+    def ocr_pages(pages: List[bytes]) -> List[Optional[str]]:
+        texts, page_statuses = _vision_rest_pages(pages, api_key)
+        statuses.extend(page_statuses)
+        return texts
+
+    texts = _ocr_with_disk_cache(images, _vision_cache_key(VISION_REST_CACHE_KEY), ocr_pages)
 
+    if any(status in (401, 403) for status in statuses):
+        # API key invalid or API not enabled - fall back to Tesseract
+        _record_ocr_failure()
+        return _ocr_tesseract(rm_files)
+
+    ocr_results = [text for text in texts if text]
     return ocr_results if ocr_results else None
 
 
-def _ocr_google_vision_sdk(rm_files: List[Path]) -> Optional[List[str]]:
+def _vision_rest_pages(
+    pages: List[bytes], api_key: str
+) -> Tuple[List[Optional[str]], List[Optional[int]]]:
     """
-    OCR using Google Cloud Vision SDK with service account credentials.
+    OCR rendered pages with the Vision REST API, batching requests concurrently.
+
+    Returns:
+        Tuple of (texts aligned with pages, HTTP status of each batch)
     """
+    from concurrent.futures import ThreadPoolExecutor
+
+    batches = _vision_batches(_vision_images(pages))
+    with ThreadPoolExecutor(max_workers=_vision_workers(len(batches))) as executor:
+        results = list(
+            executor.map(lambda batch: _ocr_google_vision_rest_batch(batch, api_key), batches)
+        )
+    return ([text for texts, _ in results for text in texts], [status for _, status in results])
+
+
+def _vision_images(images: List[bytes]) -> List[bytes]:
+    """
+    Encode rendered pages for the Vision API.
+
+    PNG pages are sent as-is by default. With REMARKABLE_VISION_IMAGE_FORMAT=jpeg
+    they are downscaled to VISION_JPEG_MAX_EDGE and JPEG-encoded, which makes
+    requests several times smaller at some cost in handwriting accuracy.
+    """
+    if get_vision_image_format() != "jpeg":
+        return images
     try:
-        import subprocess
-        import tempfile
+        from PIL import Image as PILImage
+    except ImportError:
+        return images
+
+    encoded = []
+    for png_bytes in images:
+        img = PILImage.open(io.BytesIO(png_bytes))
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        img.thumbnail((VISION_JPEG_MAX_EDGE, VISION_JPEG_MAX_EDGE), PILImage.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        encoded.append(out.getvalue())
+    return encoded
+
+
+def _vision_cache_key(backend_key: str) -> str:
+    """OCR disk-cache key for a Vision backend, separating JPEG-encoded requests."""
+    image_format = get_vision_image_format()
+    return backend_key if image_format != "jpeg" else f"{backend_key}:{image_format}"
+
+
+def _vision_batches(images: List[bytes]) -> List[List[bytes]]:
+    """Split rendered pages into Vision API batches, by count and by request size."""
+    batches: List[List[bytes]] = []
+    batch: List[bytes] = []
+    batch_bytes = 0
+    for png in images:
+        # base64 grows the payload by a third
+        size = len(png) * 4 // 3
+        if batch and (len(batch) == VISION_BATCH_SIZE or batch_bytes + size > VISION_BATCH_BYTES):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(png)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _get_vision_session() -> Any:
+    """
+    Get the shared Google Vision HTTP session, so connections and TLS are reused.
 
-        from google.cloud import vision
+    With the h2 package installed (the [http2] extra), concurrent batches are
+    multiplexed over one HTTP/2 connection; otherwise each batch gets its own
+    keep-alive HTTP/1.1 connection.
+    """
+    global _vision_session
+    if _vision_session is None:
+        with _vision_session_lock:
+            if _vision_session is None:
+                _vision_session = _new_vision_session()
+    return _vision_session
 
-        client = vision.ImageAnnotatorClient()
-        ocr_results = []
 
-        for rm_file in rm_files:
-            tmp_svg_path = None
-            tmp_png_path = None
-            tmp_raw_path = None
+def _new_vision_session() -> Any:
+    """Create an HTTP/2 client if h2 is installed, else a pooled requests session."""
+    try:
+        import httpx
+
+        # httpx raises ImportError here when h2 is not installed
+        return httpx.Client(http2=True)
+    except ImportError:
+        pass
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # One keep-alive connection per concurrent batch
+    session.mount("https://", HTTPAdapter(pool_maxsize=OCR_MAX_WORKERS))
+    return session
+
+
+def _ocr_google_vision_rest_batch(
+    images: List[bytes], api_key: str
+) -> Tuple[List[Optional[str]], Optional[int]]:
+    """
+    OCR a batch of rendered pages with one Google Cloud Vision REST request.
+
+    Returns:
+        Tuple of (texts, status_code); texts is aligned with images, with None
+        for pages that produced no text or failed individually.
+    """
+    import base64
+
+    no_text: List[Optional[str]] = [None] * len(images)
+    try:
+        # Call Google Vision REST API
+        url = f"https://vision.googleapis.com/v1/images:annotate?key={api_key}"
+        payload = {
+            "requests": [
+                {
+                    "image": {"content": base64.b64encode(png).decode("utf-8")},
+                    "features": [{"type": "DOCUMENT_TEXT_DETECTION"}],
+                }
+                for png in images
+            ]
+        }
+
+        session = _get_vision_session()
+        timeout = OCR_TIMEOUT_SECONDS * len(images)
+        for attempt in range(VISION_MAX_RETRIES + 1):
             try:
-                # Create temp files
-                with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp_svg:
-                    tmp_svg_path = Path(tmp_svg.name)
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_png:
-                    tmp_png_path = Path(tmp_png.name)
-
-                # Convert .rm to SVG using rmc
-                result = subprocess.run(
-                    ["rmc", "-t", "svg", "-o", str(tmp_svg_path), str(rm_file)],
-                    capture_output=True,
-                    timeout=30,
-                )
-                if result.returncode != 0:
-                    continue
+                response = session.post(url, json=payload, timeout=timeout)
+            except Exception:
+                # Timed out or the connection dropped - retried like a 5xx
+                if attempt == VISION_MAX_RETRIES:
+                    raise
+                time.sleep(_vision_retry_delay(None, attempt))
+                continue
+            if response.status_code not in VISION_RETRY_STATUSES or attempt == VISION_MAX_RETRIES:
+                break
+            # Rate limited or transient server error - back off and retry
+            time.sleep(_vision_retry_delay(response, attempt))
+        if response.status_code != 200:
+            return (no_text, response.status_code)
+
+        texts: List[Optional[str]] = []
+        for resp in response.json().get("responses", []):
+            # A per-image error only affects that page
+            text = "" if "error" in resp else resp.get("fullTextAnnotation", {}).get("text", "")
+            texts.append(text.strip() or None)
+        return (texts, 200)
 
-                # Convert SVG to PNG using cairosvg
-                try:
-                    import cairosvg
-                    from PIL import Image as PILImage
+    except Exception:
+        # API call failed - skip these pages
+        return (no_text, None)
 
-                    # Convert to PNG (comes out with transparent background)
-                    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_raw:
-                        tmp_raw_path = Path(tmp_raw.name)
 
-                    cairosvg.svg2png(
-                        url=str(tmp_svg_path),
-                        write_to=str(tmp_raw_path),
-                        output_width=REMARKABLE_WIDTH,
-                        output_height=REMARKABLE_HEIGHT,
-                    )
+def _vision_retry_delay(response: Optional[Any], attempt: int) -> float:
+    """
+    Seconds to wait before retrying a Vision request.
 
-                    # Add white background (SVG renders as black-on-transparent)
-                    img = PILImage.open(tmp_raw_path)
-                    if img.mode == "RGBA":
-                        bg = PILImage.new("RGB", img.size, (255, 255, 255))
-                        bg.paste(img, mask=img.split()[3])
-                        img = bg
-                    img.save(tmp_png_path)
-                    tmp_raw_path.unlink(missing_ok=True)
-                    tmp_raw_path = None
-                except ImportError:
-                    # Fall back to inkscape
-                    result = subprocess.run(
-                        ["inkscape", str(tmp_svg_path), "--export-filename", str(tmp_png_path)],
-                        capture_output=True,
-                        timeout=30,
-                    )
-                    if result.returncode != 0:
-                        continue
+    Uses the server's Retry-After header when it gives a number of seconds,
+    otherwise (or without a response) exponential backoff with jitter; capped
+    at VISION_MAX_BACKOFF_SECONDS.
+    """
+    try:
+        delay = float(response.headers.get("Retry-After") if response is not None else None)
+    except (TypeError, ValueError):
+        delay = 2**attempt + random.random()
+    return min(VISION_MAX_BACKOFF_SECONDS, max(0.0, delay))
 
-                # Send to Google Vision API
-                with open(tmp_png_path, "rb") as f:
-                    content = f.read()
 
-                image = vision.Image(content=content)
+def _ocr_google_vision_sdk(rm_files: List[Path]) -> Optional[List[str]]:
+    """
+    OCR using Google Cloud Vision SDK with service account credentials.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-                # Use DOCUMENT_TEXT_DETECTION for best handwriting results
-                response = client.document_text_detection(image=image)
+    try:
+        from google.api_core import exceptions as api_exceptions
+        from google.api_core import retry as api_retry
+        from google.cloud import vision
 
-                if response.error.message:
-                    continue
+        client = vision.ImageAnnotatorClient()
+        ocr_results = []
 
-                if response.full_text_annotation.text:
-                    ocr_results.append(response.full_text_annotation.text.strip())
+        try:
+            images = _render_pages_for_ocr(rm_files)
+        except FileNotFoundError:
+            # rmc not installed
+            return None
 
-            except subprocess.TimeoutExpired:
-                # Page rendering timed out - skip this page and continue
-                pass
-            except FileNotFoundError:
-                # rmc not installed
-                return None
-            finally:
-                if tmp_svg_path:
-                    tmp_svg_path.unlink(missing_ok=True)
-                if tmp_png_path:
-                    tmp_png_path.unlink(missing_ok=True)
-                if tmp_raw_path:
-                    tmp_raw_path.unlink(missing_ok=True)
+        # Use DOCUMENT_TEXT_DETECTION for best handwriting results
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+
+        # Retry rate limiting and transient server errors with exponential backoff
+        retry = api_retry.Retry(
+            predicate=api_retry.if_exception_type(
+                api_exceptions.TooManyRequests,
+                api_exceptions.InternalServerError,
+                api_exceptions.BadGateway,
+                api_exceptions.ServiceUnavailable,
+                api_exceptions.GatewayTimeout,
+            ),
+            maximum=VISION_MAX_BACKOFF_SECONDS,
+            deadline=120,
+        )
+
+        def annotate(batch: List[bytes]) -> Any:
+            return client.batch_annotate_images(
+                requests=[
+                    vision.AnnotateImageRequest(
+                        image=vision.Image(content=png_bytes), features=[feature]
+                    )
+                    for png_bytes in batch
+                ],
+                retry=retry,
+            )
+
+        def ocr_pages(pages: List[bytes]) -> List[Optional[str]]:
+            batches = _vision_batches(_vision_images(pages))
+            # The gRPC client is thread-safe, so batches are sent concurrently
+            with ThreadPoolExecutor(max_workers=_vision_workers(len(batches))) as executor:
+                responses = list(executor.map(annotate, batches))
+
+            texts: List[Optional[str]] = []
+            for response in responses:
+                for page_response in response.responses:
+                    # A per-image error only affects that page
+                    if page_response.error.message:
+                        texts.append(None)
+                    else:
+                        texts.append(page_response.full_text_annotation.text.strip() or None)
+            return texts
+
+        images = [png for png in images if png]
+        if not images:
+            return None
+
+        cache_key = _vision_cache_key(VISION_SDK_CACHE_KEY)
+        for text in _ocr_with_disk_cache(images, cache_key, ocr_pages):
+            if text:
+                ocr_results.append(text)
 
         return ocr_results if ocr_results else None
 
     except ImportError:
         # google-cloud-vision not installed, fall back to tesseract
+        _record_ocr_failure()
         return _ocr_tesseract(rm_files)
     except Exception:
         # API error, fall back to tesseract
+        _record_ocr_failure()
         return _ocr_tesseract(rm_files)
 
 
@@ -1129,108 +2198,214 @@ def _ocr_tesseract(rm_files: List[Path]) -> Optional[List[str]]:
     OCR using Tesseract.
     Basic quality - designed for printed text, not handwriting.
 
-    Requires: pytesseract, rmc, cairosvg (or inkscape)
+    Requires: pytesseract, rmc, cairosvg (or inkscape). Uses tesserocr instead
+    of the tesseract command when it is installed.
     """
     try:
-        import subprocess
-        import tempfile
+        import pytesseract  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        # OCR dependencies not installed
+        return None
 
-        import pytesseract
-        from PIL import Image, ImageFilter, ImageOps
+    from concurrent.futures import ThreadPoolExecutor
 
-        ocr_results = []
+    try:
+        # Native resolution: the page is binarized, so upscaling only adds pixels
+        images = _render_pages_for_ocr(rm_files)
+    except FileNotFoundError:
+        # rmc not installed
+        return None
 
-        for rm_file in rm_files:
-            tmp_svg_path = None
-            tmp_png_path = None
-            tmp_raw_path = None
-            try:
-                # Create temp files
-                with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as tmp_svg:
-                    tmp_svg_path = Path(tmp_svg.name)
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_png:
-                    tmp_png_path = Path(tmp_png.name)
-
-                # Convert .rm to SVG using rmc
-                result = subprocess.run(
-                    ["rmc", "-t", "svg", "-o", str(tmp_svg_path), str(rm_file)],
-                    capture_output=True,
-                    timeout=30,
-                )
-                if result.returncode != 0:
-                    continue
+    # tesseract runs as an external binary, so threads are enough to overlap pages
+    images = [png for png in images if png]
+    if not images:
+        return None
 
-                # Convert SVG to PNG with higher resolution for better OCR
-                try:
-                    import cairosvg
+    def ocr_pages(pages: List[bytes]) -> List[Optional[str]]:
+        with ThreadPoolExecutor(max_workers=_render_workers(len(pages))) as executor:
+            return list(executor.map(_tesseract_page, pages))
 
-                    # Convert to PNG (comes out with transparent background)
-                    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_raw:
-                        tmp_raw_path = Path(tmp_raw.name)
+    texts = _ocr_with_disk_cache(images, _ocr_cache_key("tesseract"), ocr_pages)
 
-                    # Use 1.5x resolution for better OCR (2x is too slow)
-                    cairosvg.svg2png(
-                        url=str(tmp_svg_path),
-                        write_to=str(tmp_raw_path),
-                        output_width=2106,  # 1.5x reMarkable width
-                        output_height=2808,  # 1.5x reMarkable height
-                    )
+    ocr_results = [text for text in texts if text]
+    return ocr_results if ocr_results else None
 
-                    # Add white background (SVG renders as black-on-transparent)
-                    img = Image.open(tmp_raw_path)
-                    if img.mode == "RGBA":
-                        bg = Image.new("RGB", img.size, (255, 255, 255))
-                        bg.paste(img, mask=img.split()[3])
-                        img = bg
-                    img.save(tmp_png_path)
-                    tmp_raw_path.unlink(missing_ok=True)
-                    tmp_raw_path = None
-                except ImportError:
-                    result = subprocess.run(
-                        ["inkscape", str(tmp_svg_path), "--export-filename", str(tmp_png_path)],
-                        capture_output=True,
-                        timeout=30,
-                    )
-                    if result.returncode != 0:
-                        continue
 
-                # Preprocess image for better OCR
-                img = Image.open(tmp_png_path)
+def _ocr_tiered(rm_files: List[Path]) -> Optional[List[str]]:
+    """
+    OCR with Tesseract first, sending only low-confidence pages to Google Vision.
+
+    A page is escalated when Tesseract's mean word confidence is below
+    REMARKABLE_OCR_CONFIDENCE_THRESHOLD (default 60) or it reads fewer than
+    TIERED_MIN_TEXT_CHARS characters. Escalation needs GOOGLE_VISION_API_KEY;
+    without it, or if Vision fails, the Tesseract text is kept.
+    """
+    try:
+        import pytesseract  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        # OCR dependencies not installed
+        return None
+
+    try:
+        images = [png for png in _render_pages_for_ocr(rm_files) if png]
+    except FileNotFoundError:
+        # rmc not installed
+        return None
+    if not images:
+        return None
+
+    texts = _ocr_with_disk_cache(images, _ocr_cache_key("tiered"), ocr_images_tiered)
+
+    ocr_results = [text for text in texts if text]
+    return ocr_results if ocr_results else None
+
+
+def ocr_images_tiered(images: List[bytes]) -> List[Optional[str]]:
+    """
+    OCR rendered pages with Tesseract, re-reading low-confidence pages with Google Vision.
 
-                # Convert to grayscale
-                img = img.convert("L")
+    The tiered policy shared by document extraction and the image tool; see
+    _ocr_tiered() for when a page is escalated.
 
-                # Increase contrast
-                img = ImageOps.autocontrast(img, cutoff=2)
+    Returns:
+        Texts aligned with images
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    threshold = _ocr_confidence_threshold()
+    api_key = os.environ.get("GOOGLE_VISION_API_KEY")
+
+    with ThreadPoolExecutor(max_workers=_render_workers(len(images))) as executor:
+        scored = list(executor.map(_tesseract_page_scored, images))
+    texts = [text for text, _ in scored]
+
+    low = [
+        i
+        for i, (text, confidence) in enumerate(scored)
+        if len(text or "") < TIERED_MIN_TEXT_CHARS or confidence < threshold
+    ]
+    if low and api_key:
+        vision_texts, _ = _vision_rest_pages([images[i] for i in low], api_key)
+        for i, text in zip(low, vision_texts):
+            if not text:
+                # Keep the Tesseract text, but the result is not Vision-quality
+                _record_ocr_failure()
+            texts[i] = text or texts[i]
+    return texts
+
+
+def _ocr_confidence_threshold() -> float:
+    """Tesseract confidence (0-100) below which tiered OCR escalates a page to Vision."""
+    try:
+        return float(os.environ.get("REMARKABLE_OCR_CONFIDENCE_THRESHOLD", "60"))
+    except ValueError:
+        return 60.0
+
+
+_TESSERACT_INK_LUT = [0 if level < TESSERACT_INK_THRESHOLD else 255 for level in range(256)]
+
+
+# tesserocr API objects are not thread-safe, so each OCR thread gets its own
+_tesserocr_local = threading.local()
+
+
+def _get_tesserocr_api() -> Any:
+    """
+    Get this thread's tesserocr API, so the language model loads once per thread.
+
+    Returns None if tesserocr is not installed or can't load its model, in
+    which case pages go through the pytesseract command instead.
+    """
+    api = getattr(_tesserocr_local, "api", None)
+    if api is None:
+        try:
+            from tesserocr import OEM, PSM, PyTessBaseAPI
+
+            # Same settings as TESSERACT_CONFIG
+            api = PyTessBaseAPI(psm=PSM.SPARSE_TEXT, oem=OEM.DEFAULT)
+        except Exception:
+            api = False
+        _tesserocr_local.api = api
+    return api or None
 
-                # Slight sharpening
-                img = img.filter(ImageFilter.SHARPEN)
 
-                # Run OCR with optimized settings for sparse handwriting
-                # PSM 11 = Sparse text - find as much text as possible
-                # PSM 6 = Uniform block of text (alternative)
-                custom_config = r"--psm 11 --oem 3"
-                text = pytesseract.image_to_string(img, config=custom_config)
+def _tesseract_image(png_bytes: bytes) -> Any:
+    """Open a rendered page as the 1-bit image Tesseract is given."""
+    from PIL import Image
 
-                if text.strip():
-                    ocr_results.append(text.strip())
+    # Rendered pages are already dark-on-white grayscale, so binarize them
+    # with one lookup table pass; Tesseract would threshold them anyway
+    img = Image.open(io.BytesIO(png_bytes)).convert("L")
+    return img.point(_TESSERACT_INK_LUT, mode="1")
 
-            except subprocess.TimeoutExpired:
-                # Page rendering timed out - skip this page and continue
-                pass
-            except FileNotFoundError:
-                # rmc not installed
+
+def _tesseract_page(png_bytes: bytes) -> Optional[str]:
+    """Preprocess one rendered page and run Tesseract on it."""
+    try:
+        img = _tesseract_image(png_bytes)
+
+        api = _get_tesserocr_api()
+        if api is not None:
+            api.SetImage(img)
+            # Tesseract stops recognizing at the deadline and reports failure
+            if not api.Recognize(timeout=OCR_TIMEOUT_SECONDS * 1000):
                 return None
-            finally:
-                if tmp_svg_path:
-                    tmp_svg_path.unlink(missing_ok=True)
-                if tmp_png_path:
-                    tmp_png_path.unlink(missing_ok=True)
-                if tmp_raw_path:
-                    tmp_raw_path.unlink(missing_ok=True)
+            return api.GetUTF8Text().strip() or None
 
-        return ocr_results if ocr_results else None
+        import pytesseract
 
-    except ImportError:
-        # OCR dependencies not installed
+        # Run OCR with optimized settings for sparse handwriting
+        # PSM 11 = Sparse text - find as much text as possible
+        # PSM 6 = Uniform block of text (alternative)
+        text = pytesseract.image_to_string(
+            img, config=TESSERACT_CONFIG, timeout=OCR_TIMEOUT_SECONDS
+        )
+        return text.strip() or None
+    except Exception:
+        # OCR failed for this page - skip it
         return None
+
+
+def _tesseract_page_scored(png_bytes: bytes) -> Tuple[Optional[str], float]:
+    """
+    Run Tesseract on one rendered page and report its mean word confidence.
+
+    Returns:
+        Tuple of (text or None, confidence 0-100); failures score 0
+    """
+    try:
+        img = _tesseract_image(png_bytes)
+
+        api = _get_tesserocr_api()
+        if api is not None:
+            api.SetImage(img)
+            if not api.Recognize(timeout=OCR_TIMEOUT_SECONDS * 1000):
+                return (None, 0.0)
+            return (api.GetUTF8Text().strip() or None, float(api.MeanTextConf()))
+
+        import pytesseract
+
+        data = pytesseract.image_to_data(
+            img,
+            config=TESSERACT_CONFIG,
+            timeout=OCR_TIMEOUT_SECONDS,
+            output_type=pytesseract.Output.DICT,
+        )
+        lines: Dict[tuple, List[str]] = {}
+        confidences = []
+        for idx, word in enumerate(data["text"]):
+            confidence = float(data["conf"][idx])
+            if not word.strip() or confidence < 0:
+                continue
+            line = (data["block_num"][idx], data["par_num"][idx], data["line_num"][idx])
+            lines.setdefault(line, []).append(word.strip())
+            confidences.append(confidence)
+
+        text = "\n".join(" ".join(words) for words in lines.values())
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return (text or None, confidence)
+    except Exception:
+        # OCR failed for this page - let tiered OCR escalate it
+        return (None, 0.0)
@@ -276,7 +276,7 @@ def _register_document(
         return False
 
     # Skip cloud-archived documents (not available on device)
-    if hasattr(doc, "is_cloud_archived") and doc.is_cloud_archived:
+    if getattr(doc, "is_cloud_archived", False):
         return False
 
     # Get the full path
@@ -195,7 +195,7 @@ def get_ocr_backend() -> str:
     Get the configured OCR backend from the environment.
 
     Returns the raw value from REMARKABLE_OCR_BACKEND env var (default: "auto").
-    Possible values: "sampling", "google", "tesseract", "auto"
+    Possible values: "sampling", "google", "tesseract", "tiered", "auto"
 
     Note: This function only returns the configured string. The actual backend
     selection logic (for "auto" mode) is implemented in the tool functions.
@@ -34,7 +34,7 @@ DEFAULT_SSH_PORT = 22
 XOCHITL_PATH = "/home/root/.local/share/remarkable/xochitl"
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     """Represents a document or folder on the reMarkable tablet."""
 
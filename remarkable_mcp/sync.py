@@ -8,12 +8,14 @@ Based on the protocol used by ddvk/rmapi.
 """
 
 import json
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # API endpoints
 # Note: my.remarkable.com endpoints redirect to doesnotexist.remarkable.com
@@ -26,8 +28,33 @@ SYNC_HOST = "https://internal.cloud.remarkable.com"
 ROOT_URL = f"{SYNC_HOST}/sync/v4/root"
 FILES_URL = f"{SYNC_HOST}/sync/v3/files"
 
+# (connect, read) timeouts in seconds
+AUTH_TIMEOUT = (3.05, 30)
+SYNC_TIMEOUT = (3.05, 60)
+HTTP_POOL_SIZE = 10
 
-@dataclass
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Get the shared HTTP session, so connections and TLS are reused across calls."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from remarkable_mcp import __version__
+
+                session = requests.Session()
+                # Keep enough idle keep-alive connections for concurrent tool calls
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": f"remarkable-mcp/{__version__}"})
+                _session = session
+    return _session
+
+
+@dataclass(slots=True)
 class Document:
     """Represents a document or folder in the reMarkable cloud."""
 
@@ -86,6 +113,10 @@ class RemarkableClient:
         self.user_token = user_token
         self._documents: List[Document] = []
         self._documents_by_id: Dict[str, Document] = {}
+        # Root hash of the last complete listing, to skip refetching an unchanged tree
+        self._root_hash: Optional[str] = None
+        # Documents by blob hash whose files were all fetched, safe to reuse
+        self._reusable_by_hash: Dict[str, Document] = {}
 
     def renew_token(self) -> str:
         """Exchange device token for a fresh user token."""
@@ -95,7 +126,7 @@ class RemarkableClient:
         headers = {"Authorization": f"Bearer {self.device_token}"}
 
         try:
-            response = requests.post(USER_TOKEN_URL, headers=headers, timeout=30)
+            response = _get_session().post(USER_TOKEN_URL, headers=headers, timeout=AUTH_TIMEOUT)
             if response.status_code == 200 and response.text:
                 self.user_token = response.text.strip()
                 return self.user_token
@@ -114,13 +145,13 @@ class RemarkableClient:
             self.renew_token()
 
         headers = {"Authorization": f"Bearer {self.user_token}"}
-        response = requests.request(method, url, headers=headers, timeout=60)
+        response = _get_session().request(method, url, headers=headers, timeout=SYNC_TIMEOUT)
 
         if response.status_code == 401:
             # Token expired, try to renew
             self.renew_token()
             headers = {"Authorization": f"Bearer {self.user_token}"}
-            response = requests.request(method, url, headers=headers, timeout=60)
+            response = _get_session().request(method, url, headers=headers, timeout=SYNC_TIMEOUT)
 
         return response
 
@@ -159,6 +190,9 @@ class RemarkableClient:
             limit: Maximum number of documents to fetch. If None, fetches all.
 
         Returns a list of Document objects (compatible with rmapy Collection).
+        If the root hash hasn't changed since the last complete listing, the
+        previous list is returned as-is; otherwise only documents whose blob
+        hash changed are fetched again.
         """
         # Get root hash
         response = self._request(ROOT_URL)
@@ -184,26 +218,44 @@ class RemarkableClient:
             )
 
         root_hash = root_data["hash"]
+        if root_hash == self._root_hash:
+            return self._documents if limit is None else self._documents[:limit]
 
         # Get root index
         root_index = self._get_file(root_hash)
         entries = self._parse_index(root_index)
 
+        # A document's blob hash changes whenever any of its files do
+        known_by_hash = self._reusable_by_hash
+        reusable_by_hash: Dict[str, Document] = {}
         documents = []
+        complete = True
 
         for entry in entries:
             doc_id = entry["id"]
             doc_hash = entry["hash"]
 
+            known = known_by_hash.get(doc_hash)
+            if known is not None and known.id == doc_id:
+                documents.append(known)
+                reusable_by_hash[doc_hash] = known
+                if limit is not None and len(documents) >= limit:
+                    complete = False
+                    break
+                continue
+
             # Fetch the document's blob index
             try:
                 blob_content = self._get_file(doc_hash)
                 blob_entries = self._parse_index(blob_content)
             except Exception:
+                # Don't cache a listing missing this document; retry next call
+                complete = False
                 continue
 
             # Find and fetch the metadata file
             metadata = {}
+            metadata_ok = True
             files = []
 
             for blob_entry in blob_entries:
@@ -213,7 +265,7 @@ class RemarkableClient:
                         meta_content = self._get_file(blob_entry["hash"])
                         metadata = json.loads(meta_content.decode("utf-8"))
                     except Exception:
-                        pass
+                        metadata_ok = False
 
             # Skip deleted documents
             if metadata.get("deleted", False):
@@ -242,13 +294,21 @@ class RemarkableClient:
             )
 
             documents.append(doc)
+            if metadata_ok:
+                reusable_by_hash[doc_hash] = doc
+            else:
+                # Named by its ID for now; fetch the metadata again next call
+                complete = False
 
             # Stop early if we have enough
             if limit is not None and len(documents) >= limit:
+                complete = False
                 break
 
         self._documents = documents
         self._documents_by_id = {d.id: d for d in documents}
+        self._reusable_by_hash = reusable_by_hash
+        self._root_hash = root_hash if complete else None
 
         return documents
 
@@ -304,7 +364,7 @@ def register_device(one_time_code: str) -> Dict[str, str]:
     }
 
     try:
-        response = requests.post(DEVICE_TOKEN_URL, json=body, timeout=30)
+        response = _get_session().post(DEVICE_TOKEN_URL, json=body, timeout=AUTH_TIMEOUT)
         if response.status_code == 200 and response.text:
             device_token = response.text.strip()
             return {"devicetoken": device_token, "usertoken": ""}
@@ -10,7 +10,7 @@ import os
 import re
 import tempfile
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Literal, Optional, Tuple
 
 from mcp.server.fastmcp import Context
 from mcp.types import (
@@ -22,13 +22,14 @@ from mcp.types import (
 )
 
 from remarkable_mcp.api import (
-    REMARKABLE_TOKEN,
+    build_path_index,
     download_raw_file,
     get_file_type,
-    get_item_path,
-    get_items_by_id,
-    get_items_by_parent,
     get_rmapi,
+    index_items,
+    invalidate_rmapi,
+    remarkable_token,
+    use_ssh,
 )
 from remarkable_mcp.extract import (
     cache_page_ocr,
@@ -37,9 +38,9 @@ from remarkable_mcp.extract import (
     extract_text_from_pdf,
     find_similar_documents,
     get_background_color,
-    get_cached_ocr_result,
     get_cached_page_ocr,
     get_document_page_count,
+    ocr_images_tiered,
     render_page_from_document_zip,
     render_page_from_document_zip_svg,
 )
@@ -157,13 +158,52 @@ DEFAULT_PAGE_SIZE = 8000
 def _is_cloud_archived(item) -> bool:
     """Check if an item is cloud-archived (not available on device)."""
     # SSH mode: check is_cloud_archived property
-    if hasattr(item, "is_cloud_archived"):
-        return item.is_cloud_archived
+    archived = getattr(item, "is_cloud_archived", None)
+    if archived is not None:
+        return archived
     # Cloud mode: check parent == "trash"
-    parent = item.Parent if hasattr(item, "Parent") else getattr(item, "parent", "")
+    parent = getattr(item, "Parent", None)
+    if parent is None:
+        parent = getattr(item, "parent", "")
     return parent == "trash"
 
 
+def _ocr_png(png_data: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """
+    OCR a rendered page with the configured backend, other than sampling.
+
+    Args:
+        png_data: PNG image bytes
+
+    Returns:
+        Tuple of (extracted text or None, backend used or None)
+    """
+    backend = get_ocr_backend()
+    if backend == "tiered":
+        # Same Tesseract-then-Vision policy as document extraction
+        ocr_text = ocr_images_tiered([png_data])[0]
+        return (ocr_text, "tiered") if ocr_text else (None, None)
+
+    # Need to temporarily save PNG to file for tesseract/google
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as ocr_tmp:
+        ocr_tmp.write(png_data)
+        ocr_tmp_path = Path(ocr_tmp.name)
+    try:
+        # When backend is "sampling" but sampling failed, fall through to
+        # Google (if API key available) or Tesseract as per documented behavior
+        if backend in ("sampling", "google") or (
+            backend == "auto" and os.environ.get("GOOGLE_VISION_API_KEY")
+        ):
+            ocr_text = _ocr_png_google_vision(ocr_tmp_path)
+            if ocr_text:
+                return (ocr_text, "google")
+        # Fall through to Tesseract if Google not available or returned None
+        ocr_text = _ocr_png_tesseract(ocr_tmp_path)
+        return (ocr_text, "tesseract") if ocr_text else (None, None)
+    finally:
+        ocr_tmp_path.unlink(missing_ok=True)
+
+
 def _ocr_png_tesseract(png_path: Path) -> Optional[str]:
     """
     OCR a PNG file using Tesseract.
@@ -297,7 +337,8 @@ async def remarkable_read(
     try:
         client = get_rmapi()
         collection = client.get_meta_items()
-        items_by_id = get_items_by_id(collection)
+        items_by_id, _ = index_items(collection)
+        paths = build_path_index(items_by_id)
 
         # Validate parameters
         page = max(1, page)
@@ -314,7 +355,7 @@ async def remarkable_read(
         document_lower = actual_document.lower().strip("/")
 
         for doc in documents:
-            doc_path = get_item_path(doc, items_by_id)
+            doc_path = paths[doc.ID]
             # Filter by root path
             if not _is_within_root(doc_path, root):
                 continue
@@ -329,9 +370,7 @@ async def remarkable_read(
 
         if not target_doc:
             # Find similar documents for suggestion (only within root)
-            filtered_docs = [
-                doc for doc in documents if _is_within_root(get_item_path(doc, items_by_id), root)
-            ]
+            filtered_docs = [doc for doc in documents if _is_within_root(paths[doc.ID], root)]
             similar = find_similar_documents(document, filtered_docs)
             search_term = document.split()[0] if document else "notes"
             return make_error(
@@ -344,7 +383,7 @@ async def remarkable_read(
                 did_you_mean=similar if similar else None,
             )
 
-        doc_path = get_item_path(target_doc, items_by_id)
+        doc_path = paths[target_doc.ID]
         file_type = get_file_type(client, target_doc)
 
         # Collect content based on content_type
@@ -447,15 +486,8 @@ async def remarkable_read(
                     finally:
                         tmp_path.unlink(missing_ok=True)
 
-            # For non-sampling: check full document cache or extract all
-            if not use_sampling and is_notebook and include_ocr:
-                cached = get_cached_ocr_result(target_doc.ID, include_ocr=True, ocr_backend=None)
-                if cached and cached.get("handwritten_text"):
-                    notebook_pages = cached["handwritten_text"]
-                    ocr_backend_used = cached.get("ocr_backend")
-                    content = cached
-
-            # If not cached (non-sampling), perform extraction
+            # For non-sampling: extract all. extract_text_from_document_zip() serves
+            # cached results only while the zip's fingerprint is unchanged
             if not notebook_pages and is_notebook:
                 raw_doc = client.download(target_doc)
                 with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
@@ -562,9 +594,7 @@ async def remarkable_read(
                 "page_type": "notebook",
                 "total_chars": len(page_content),
                 "more": has_more,
-                "modified": (
-                    target_doc.ModifiedClient if hasattr(target_doc, "ModifiedClient") else None
-                ),
+                "modified": getattr(target_doc, "ModifiedClient", None),
             }
 
             # Add OCR backend info if OCR was used
@@ -664,9 +694,7 @@ async def remarkable_read(
                 "total_pages": 1,
                 "total_chars": 0,
                 "more": False,
-                "modified": (
-                    target_doc.ModifiedClient if hasattr(target_doc, "ModifiedClient") else None
-                ),
+                "modified": getattr(target_doc, "ModifiedClient", None),
             }
             hint = (
                 f"Document '{target_doc.VissibleName}' has no extractable text content. "
@@ -697,9 +725,7 @@ async def remarkable_read(
             "total_pages": total_pages,
             "total_chars": total_chars,
             "more": has_more,
-            "modified": (
-                target_doc.ModifiedClient if hasattr(target_doc, "ModifiedClient") else None
-            ),
+            "modified": getattr(target_doc, "ModifiedClient", None),
         }
 
         if has_more:
@@ -770,8 +796,8 @@ def remarkable_browse(path: str = "/", query: Optional[str] = None) -> str:
     try:
         client = get_rmapi()
         collection = client.get_meta_items()
-        items_by_id = get_items_by_id(collection)
-        items_by_parent = get_items_by_parent(collection)
+        items_by_id, items_by_parent = index_items(collection)
+        paths = build_path_index(items_by_id)
 
         root = _get_root_path()
         # Resolve user path to actual device path
@@ -786,7 +812,7 @@ def remarkable_browse(path: str = "/", query: Optional[str] = None) -> str:
                 # Skip cloud-archived items
                 if _is_cloud_archived(item):
                     continue
-                item_path = get_item_path(item, items_by_id)
+                item_path = paths[item.ID]
                 # Filter by root path
                 if not _is_within_root(item_path, root):
                     continue
@@ -796,9 +822,7 @@ def remarkable_browse(path: str = "/", query: Optional[str] = None) -> str:
                             "name": item.VissibleName,
                             "path": _apply_root_filter(item_path),
                             "type": "folder" if item.is_folder else "document",
-                            "modified": (
-                                item.ModifiedClient if hasattr(item, "ModifiedClient") else None
-                            ),
+                            "modified": getattr(item, "ModifiedClient", None),
                         }
                     )
 
@@ -854,7 +878,7 @@ def remarkable_browse(path: str = "/", query: Optional[str] = None) -> str:
                     # Check if it's a document (only valid as the last path part)
                     if found_document and i == len(path_parts) - 1:
                         # Auto-redirect: return first page of the document
-                        doc_path = get_item_path(found_document, items_by_id)
+                        doc_path = paths[found_document.ID]
                         # Check if within root before redirecting
                         if not _is_within_root(doc_path, root):
                             return make_error(
@@ -924,9 +948,7 @@ def remarkable_browse(path: str = "/", query: Optional[str] = None) -> str:
                     {
                         "name": item.VissibleName,
                         "id": item.ID,
-                        "modified": (
-                            item.ModifiedClient if hasattr(item, "ModifiedClient") else None
-                        ),
+                        "modified": getattr(item, "ModifiedClient", None),
                     }
                 )
 
@@ -978,7 +1000,8 @@ def remarkable_recent(limit: int = 10, include_preview: bool = False) -> str:
     try:
         client = get_rmapi()
         collection = client.get_meta_items()
-        items_by_id = get_items_by_id(collection)
+        items_by_id, _ = index_items(collection)
+        paths = build_path_index(items_by_id)
 
         # Clamp limit - lower max when previews enabled (expensive operation)
         max_limit = 10 if include_preview else 50
@@ -991,25 +1014,23 @@ def remarkable_recent(limit: int = 10, include_preview: bool = False) -> str:
         for item in collection:
             if item.is_folder or _is_cloud_archived(item):
                 continue
-            item_path = get_item_path(item, items_by_id)
+            item_path = paths[item.ID]
             if not _is_within_root(item_path, root):
                 continue
             documents.append(item)
 
         documents.sort(
-            key=lambda x: (
-                x.ModifiedClient if hasattr(x, "ModifiedClient") and x.ModifiedClient else ""
-            ),
+            key=lambda x: getattr(x, "ModifiedClient", None) or "",
             reverse=True,
         )
 
         results = []
         for doc in documents[:limit]:
-            doc_path = get_item_path(doc, items_by_id)
+            doc_path = paths[doc.ID]
             doc_info = {
                 "name": doc.VissibleName,
                 "path": _apply_root_filter(doc_path),
-                "modified": (doc.ModifiedClient if hasattr(doc, "ModifiedClient") else None),
+                "modified": getattr(doc, "ModifiedClient", None),
             }
 
             if include_preview:
@@ -1196,10 +1217,8 @@ def remarkable_status() -> str:
     """
     import os
 
-    from remarkable_mcp.api import REMARKABLE_USE_SSH
-
     # Determine transport mode
-    if REMARKABLE_USE_SSH:
+    if use_ssh():
         from remarkable_mcp.ssh import (
             DEFAULT_SSH_HOST,
             DEFAULT_SSH_PORT,
@@ -1213,12 +1232,13 @@ def remarkable_status() -> str:
         connection_info = f"SSH to {ssh_user}@{ssh_host}:{ssh_port}"
     else:
         transport = "cloud"
-        connection_info = "environment variable" if REMARKABLE_TOKEN else "file (~/.rmapi)"
+        connection_info = "environment variable" if remarkable_token() else "file (~/.rmapi)"
 
     try:
         client = get_rmapi()
         collection = client.get_meta_items()
-        items_by_id = get_items_by_id(collection)
+        items_by_id, _ = index_items(collection)
+        paths = build_path_index(items_by_id)
 
         root = _get_root_path()
 
@@ -1227,7 +1247,7 @@ def remarkable_status() -> str:
         for item in collection:
             if item.is_folder:
                 continue
-            item_path = get_item_path(item, items_by_id)
+            item_path = paths[item.ID]
             if _is_within_root(item_path, root):
                 doc_count += 1
 
@@ -1255,6 +1275,8 @@ def remarkable_status() -> str:
 
     except Exception as e:
         error_msg = str(e)
+        # Force a fresh client (and token) on the next call after a failed check
+        invalidate_rmapi()
 
         result = {
             "authenticated": False,
@@ -1263,7 +1285,7 @@ def remarkable_status() -> str:
             "error": error_msg,
         }
 
-        if REMARKABLE_USE_SSH:
+        if use_ssh():
             hint = (
                 "SSH connection failed. Make sure:\n"
                 "1) Developer mode is enabled on your tablet\n"
@@ -1352,7 +1374,8 @@ async def remarkable_image(
 
         client = get_rmapi()
         collection = client.get_meta_items()
-        items_by_id = get_items_by_id(collection)
+        items_by_id, _ = index_items(collection)
+        paths = build_path_index(items_by_id)
 
         root = _get_root_path()
         # Resolve user-provided path to actual device path
@@ -1364,7 +1387,7 @@ async def remarkable_image(
         document_lower = actual_document.lower().strip("/")
 
         for doc in documents:
-            doc_path = get_item_path(doc, items_by_id)
+            doc_path = paths[doc.ID]
             # Filter by root path
             if not _is_within_root(doc_path, root):
                 continue
@@ -1379,9 +1402,7 @@ async def remarkable_image(
 
         if not target_doc:
             # Find similar documents for suggestion (only within root)
-            filtered_docs = [
-                doc for doc in documents if _is_within_root(get_item_path(doc, items_by_id), root)
-            ]
+            filtered_docs = [doc for doc in documents if _is_within_root(paths[doc.ID], root)]
             similar = find_similar_documents(document, filtered_docs)
             search_term = document.split()[0] if document else "notes"
             return make_error(
@@ -1431,7 +1452,7 @@ async def remarkable_image(
                 )
 
             # Build resource URI for this page
-            doc_path = _apply_root_filter(get_item_path(target_doc, items_by_id))
+            doc_path = _apply_root_filter(paths[target_doc.ID])
             uri_path = doc_path.lstrip("/")
 
             # Render the page based on format
@@ -1507,27 +1528,7 @@ async def remarkable_image(
 
                     # Fall back to traditional OCR if sampling failed or not available
                     if ocr_text is None:
-                        # Need to temporarily save PNG to file for tesseract/google
-                        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as ocr_tmp:
-                            ocr_tmp.write(png_data)
-                            ocr_tmp_path = Path(ocr_tmp.name)
-                        try:
-                            backend = get_ocr_backend()
-                            # When backend is "sampling" but sampling failed, fall through to
-                            # Google (if API key available) or Tesseract as per documented behavior
-                            if backend in ("sampling", "google") or (
-                                backend == "auto" and os.environ.get("GOOGLE_VISION_API_KEY")
-                            ):
-                                ocr_text = _ocr_png_google_vision(ocr_tmp_path)
-                                if ocr_text:
-                                    ocr_backend_used = "google"
-                            # Fall through to Tesseract if Google not available or returned None
-                            if ocr_text is None:
-                                ocr_text = _ocr_png_tesseract(ocr_tmp_path)
-                                if ocr_text:
-                                    ocr_backend_used = "tesseract"
-                        finally:
-                            ocr_tmp_path.unlink(missing_ok=True)
+                        ocr_text, ocr_backend_used = _ocr_png(png_data)
 
                 resource_uri = f"remarkableimg:///{uri_path}.page-{page}.png"
                 png_base64 = base64.b64encode(png_data).decode("utf-8")
@@ -14,11 +14,14 @@ from unittest.mock import Mock, patch
 import pytest
 
 from remarkable_mcp.api import (
+    build_path_index,
     get_item_path,
     get_items_by_id,
+    index_items,
     register_and_get_token,
 )
 from remarkable_mcp.extract import (
+    clear_extraction_cache,
     extract_text_from_document_zip,
     extract_text_from_rm_file,
     find_similar_documents,
@@ -34,6 +37,18 @@ from remarkable_mcp.server import mcp
 # =============================================================================
 
 
+@pytest.fixture(autouse=True)
+def isolated_ocr_disk_cache(tmp_path):
+    """Keep the persistent OCR caches out of the user's home directory."""
+    with (
+        patch("remarkable_mcp.extract.OCR_DISK_CACHE_DIR", tmp_path / "ocr-cache"),
+        patch("remarkable_mcp.extract.PAGE_RENDER_CACHE_DIR", tmp_path / "page-cache"),
+        patch("remarkable_mcp.extract.EXTRACTION_DISK_CACHE_DIR", tmp_path / "extract-cache"),
+    ):
+        yield
+    clear_extraction_cache()
+
+
 @pytest.fixture
 def mock_document():
     """Create a mock Document object."""
@@ -188,6 +203,23 @@ class TestHelperFunctions:
         results = find_similar_documents("Meating", docs, limit=3)
         assert len(results) <= 3
 
+    def test_find_similar_documents_difflib_fallback(self):
+        """Test the difflib fallback when rapidfuzz is not installed."""
+        import sys
+
+        docs = [
+            Mock(VissibleName=name)
+            for name in ("Meeting Notes", "Project Plan", "Notes Daily", "xyz", "Meetings")
+        ]
+        with patch.dict(sys.modules, {"rapidfuzz": None}):
+            assert find_similar_documents("Notes", docs, limit=2) == [
+                "Notes Daily",
+                "Meeting Notes",
+            ]
+            assert find_similar_documents("Meating", docs)[0] == "Meetings"
+            assert "xyz" not in find_similar_documents("Meating", docs)
+            assert find_similar_documents("notes daily", docs)[0] == "Notes Daily"
+
     def test_get_items_by_id(self, mock_collection):
         """Test building ID lookup dict."""
         items_by_id = get_items_by_id(mock_collection)
@@ -195,6 +227,48 @@ class TestHelperFunctions:
         assert "doc-123" in items_by_id
         assert "folder-456" in items_by_id
 
+    def test_index_items(self, mock_document, mock_folder, mock_collection):
+        """Test building ID and parent lookups in one pass."""
+        items_by_id, items_by_parent = index_items(mock_collection)
+
+        assert items_by_id == {"doc-123": mock_document, "folder-456": mock_folder}
+        assert items_by_parent == {"": [mock_document, mock_folder]}
+
+    def test_index_items_without_parent(self):
+        """Test that items without a Parent are grouped at the root, like get_items_by_parent."""
+        from types import SimpleNamespace
+
+        from remarkable_mcp.api import get_items_by_parent
+
+        item = SimpleNamespace(ID="loose")
+        items_by_id, items_by_parent = index_items([item])
+
+        assert items_by_id == {"loose": item}
+        assert items_by_parent == get_items_by_parent([item]) == {"": [item]}
+
+    def test_build_path_index_deep_tree(self):
+        """Test that deeply nested trees don't hit the recursion limit."""
+        import sys
+
+        depth = sys.getrecursionlimit() + 100
+        items_by_id = {}
+        parent_id = ""
+        for i in range(depth):
+            item = Mock(VissibleName="d", ID=f"item-{i}", Parent=parent_id)
+            items_by_id[item.ID] = item
+            parent_id = item.ID
+
+        paths = build_path_index(items_by_id)
+        assert paths[parent_id] == "/d" * depth
+
+    def test_index_items_reuses_result_for_same_collection(self, mock_collection):
+        """Test that re-indexing the same list returns the cached dicts."""
+        first = index_items(mock_collection)
+        assert index_items(mock_collection) is first
+        assert build_path_index(first[0]) is build_path_index(first[0])
+
+        assert index_items(list(mock_collection)) is not first
+
     def test_get_item_path(self, mock_document, mock_collection):
         """Test getting full item path."""
         items_by_id = get_items_by_id(mock_collection)
@@ -215,6 +289,21 @@ class TestHelperFunctions:
         path = get_item_path(child_doc, items_by_id)
         assert path == "/Test Folder/Child Doc"
 
+    def test_build_path_index(self, mock_folder):
+        """Test that the path index matches get_item_path for every item."""
+        child_doc = Mock()
+        child_doc.VissibleName = "Child Doc"
+        child_doc.ID = "child-789"
+        child_doc.Parent = mock_folder.ID
+
+        items_by_id = {mock_folder.ID: mock_folder, child_doc.ID: child_doc}
+
+        paths = build_path_index(items_by_id)
+        assert paths == {
+            "folder-456": "/Test Folder",
+            "child-789": "/Test Folder/Child Doc",
+        }
+
 
 # =============================================================================
 # Test Text Extraction
@@ -236,6 +325,1093 @@ class TestTextExtraction:
         # Should have extracted text from txt file
         assert any("sample text" in text.lower() for text in result["typed_text"])
 
+    def test_extract_text_from_document_zip_nested_files(self, tmp_path):
+        """Test that files in subdirectories are picked up by extension."""
+        zip_path = tmp_path / "doc.zip"
+        content = {"cPages": {"pages": [{"id": "p2"}, {"id": "p1"}]}}
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc.content", json.dumps(content))
+            zf.writestr("doc/p1.rm", b"")
+            zf.writestr("doc/p2.rm", b"")
+            zf.writestr("doc/notes/readme.md", "# Nested notes")
+            zf.writestr("doc.highlights/p1.json", json.dumps({"highlights": [{"text": "hi"}]}))
+
+        result = extract_text_from_document_zip(zip_path)
+
+        assert result["pages"] == 2
+        assert result["page_ids"] == ["p2", "p1"]
+        assert "# Nested notes" in result["typed_text"]
+        assert result["highlights"] == ["hi"]
+
+    def test_sidecar_json_without_highlights_is_not_parsed(self):
+        """Test that .json page metadata without highlights skips JSON parsing."""
+        from remarkable_mcp.extract import _add_sidecar_text
+
+        result = {"typed_text": [], "highlights": []}
+        files = {".txt": [], ".md": [], ".content": [], ".json": ["pagedata", "highlights"]}
+        data = {
+            "pagedata": b'{"layers": []}',
+            "highlights": b'{"highlights": [{"text": "hi"}]}',
+        }
+        with patch("remarkable_mcp.extract._json_loads", side_effect=json.loads) as loads:
+            _add_sidecar_text(result, files, data.__getitem__)
+
+        loads.assert_called_once_with(data["highlights"])
+        assert result["highlights"] == ["hi"]
+
+    def test_extract_text_from_zip_matches_disk_extraction(self, tmp_path):
+        """Test that reading text straight from the zip matches extracting it to disk."""
+        from remarkable_mcp.extract import _extract_text_from_disk
+
+        zip_path = tmp_path / "doc.zip"
+        content = {"cPages": {"pages": [{"id": "p2"}, {"id": "p1"}]}, "text": "meta"}
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc.content", json.dumps(content))
+            zf.writestr("doc/p1.rm", b"")
+            zf.writestr("doc/p2.rm", b"")
+            zf.writestr("doc/notes.txt", "typed notes")
+            zf.writestr("doc.highlights/p1.json", json.dumps({"highlights": [{"text": "hi"}]}))
+
+        with patch("remarkable_mcp.extract._extract_text_from_disk", side_effect=AssertionError):
+            in_memory = extract_text_from_document_zip(zip_path)
+            # Zips over the in-memory limit are streamed page by page
+            with patch("remarkable_mcp.extract.IN_MEMORY_ZIP_MAX_BYTES", 0):
+                streamed = extract_text_from_document_zip(zip_path)
+
+        on_disk = {"typed_text": [], "highlights": [], "handwritten_text": None}
+        on_disk.update({"pages": 0, "page_ids": [], "ocr_backend": None})
+        _extract_text_from_disk(zip_path, on_disk, include_ocr=False)
+
+        assert in_memory == streamed == on_disk
+        assert in_memory["page_ids"] == ["p2", "p1"]
+        assert sorted(in_memory["typed_text"]) == ["meta", "typed notes"]
+
+    def test_ocr_extraction_writes_only_pages_and_sidecars(self, tmp_path):
+        """Test that OCR extraction doesn't write embedded PDFs or thumbnails to disk."""
+        zip_path = tmp_path / "doc.zip"
+        content = {"cPages": {"pages": [{"id": "p2"}, {"id": "p1"}]}}
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc.content", json.dumps(content))
+            zf.writestr("doc/p1.rm", b"p1")
+            zf.writestr("doc/p2.rm", b"p2")
+            zf.writestr("doc/notes.txt", "typed notes")
+            zf.writestr("doc.pdf", b"%PDF-1.7")
+            zf.writestr("doc.thumbnails/p1.png", b"png")
+
+        extracted = {}
+
+        def ocr(rm_files):
+            extracted_dir = rm_files[0].parent.parent
+            extracted["dir"] = extracted_dir
+            extracted["files"] = sorted(
+                str(p.relative_to(extracted_dir)) for p in extracted_dir.rglob("*") if p.is_file()
+            )
+            return ([f.read_bytes().decode() for f in rm_files], "tesseract")
+
+        with patch("remarkable_mcp.extract.extract_handwriting_ocr", side_effect=ocr):
+            result = extract_text_from_document_zip(zip_path, include_ocr=True)
+
+        assert result["page_ids"] == ["p2", "p1"]
+        assert result["handwritten_text"] == ["p2", "p1"]
+        assert "typed notes" in result["typed_text"]
+        assert extracted["files"] == ["doc.content", "doc/notes.txt", "doc/p1.rm", "doc/p2.rm"]
+        assert not extracted["dir"].exists()
+
+    def test_extraction_cache_invalidated_when_zip_changes(self, tmp_path):
+        """Test that a cached result is not reused for changed zip content."""
+        from remarkable_mcp.extract import clear_extraction_cache
+
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("notes.txt", "first version")
+        try:
+            first = extract_text_from_document_zip(zip_path, doc_id="doc-cache")
+            assert extract_text_from_document_zip(zip_path, doc_id="doc-cache") is first
+
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("notes.txt", "second version")
+            second = extract_text_from_document_zip(zip_path, doc_id="doc-cache")
+            assert second["typed_text"] == ["second version"]
+        finally:
+            clear_extraction_cache("doc-cache")
+
+    def test_extraction_disk_cache_survives_restart(self, tmp_path):
+        """Test that extraction results are reused from disk after the memory cache is gone."""
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc/p1.rm", b"")
+
+        ocr_result = (["handwriting"], "google")
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", return_value=ocr_result
+        ) as ocr:
+            first = extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+            # Simulate a server restart
+            clear_extraction_cache()
+            again = extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+            # An OCR result also satisfies a text-only request
+            clear_extraction_cache()
+            text_only = extract_text_from_document_zip(zip_path, doc_id="doc")
+
+        assert ocr.call_count == 1
+        assert again == first
+        assert text_only["handwritten_text"] == ["handwriting"]
+
+        # Expired entries are not reused
+        clear_extraction_cache()
+        with (
+            patch("remarkable_mcp.extract.DISK_CACHE_TTL_SECONDS", 0),
+            patch("remarkable_mcp.extract.extract_handwriting_ocr", return_value=ocr_result) as ocr,
+        ):
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+        assert ocr.call_count == 1
+
+    def test_extraction_disk_cache_skips_empty_ocr(self, tmp_path):
+        """Test that OCR results without text are not persisted."""
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc/p1.rm", b"")
+
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", return_value=(None, None)
+        ) as ocr:
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+            clear_extraction_cache()
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+
+        assert ocr.call_count == 2
+
+    def test_extraction_disk_cache_keyed_by_resolved_backend(self, tmp_path, monkeypatch):
+        """Test that configuring another OCR backend doesn't reuse the old backend's result."""
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc/p1.rm", b"")
+
+        monkeypatch.delenv("REMARKABLE_OCR_BACKEND", raising=False)
+        monkeypatch.delenv("GOOGLE_VISION_API_KEY", raising=False)
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", return_value=(["local"], "tesseract")
+        ):
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+
+        clear_extraction_cache()
+        monkeypatch.setenv("GOOGLE_VISION_API_KEY", "key")
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", return_value=(["vision"], "google")
+        ) as ocr:
+            result = extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+        assert ocr.call_count == 1
+        assert result["handwritten_text"] == ["vision"]
+
+    def test_extraction_disk_cache_skips_partial_ocr(self, tmp_path):
+        """Test that results where a page failed to render or OCR are not persisted."""
+        from remarkable_mcp.extract import _record_ocr_failure
+
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc/p1.rm", b"")
+            zf.writestr("doc/p2.rm", b"")
+
+        def partial_ocr(rm_files):
+            # e.g. one Vision batch timed out
+            _record_ocr_failure()
+            return (["page one"], "google")
+
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", side_effect=partial_ocr
+        ) as ocr:
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+            clear_extraction_cache()
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+
+        assert ocr.call_count == 2
+
+    def test_extraction_disk_hit_keeps_cached_include_ocr(self, tmp_path):
+        """Test that an OCR result loaded from disk for a text request still serves OCR."""
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc/p1.rm", b"")
+
+        ocr_result = (["handwriting"], "tesseract")
+        with patch(
+            "remarkable_mcp.extract.extract_handwriting_ocr", return_value=ocr_result
+        ) as ocr:
+            extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+            clear_extraction_cache()
+            extract_text_from_document_zip(zip_path, doc_id="doc")
+            # Served from memory, which the text-only disk hit filled with the OCR entry
+            with patch("remarkable_mcp.extract._read_disk_cache_file", return_value=None):
+                result = extract_text_from_document_zip(zip_path, include_ocr=True, doc_id="doc")
+
+        assert ocr.call_count == 1
+        assert result["handwritten_text"] == ["handwriting"]
+
+    def test_page_ocr_cache_is_bounded_and_cleared_per_document(self):
+        """Test LRU eviction and per-document clearing of the page OCR cache."""
+        from remarkable_mcp import extract
+
+        extract.clear_extraction_cache()
+        with patch.object(extract._page_ocr_cache, "_max_entries", 2):
+            extract.cache_page_ocr("doc-a", 1, "sampling", "a1")
+            extract.cache_page_ocr("doc-b", 1, "sampling", "b1")
+            assert extract.get_cached_page_ocr("doc-a", 1, "sampling") == "a1"
+            # doc-b is now least recently used and is evicted
+            extract.cache_page_ocr("doc-a", 2, "sampling", "a2")
+            assert extract.get_cached_page_ocr("doc-b", 1, "sampling") is None
+            assert "doc-b" not in extract._page_keys_by_doc
+
+            extract.clear_extraction_cache("doc-a")
+            assert extract.get_cached_page_ocr("doc-a", 2, "sampling") is None
+            assert len(extract._page_ocr_cache) == 0
+            assert extract._page_keys_by_doc == {}
+
+    def test_page_ocr_cache_expires(self):
+        """Test that cached pages expire after the TTL."""
+        from remarkable_mcp import extract
+
+        extract.clear_extraction_cache()
+        with patch.object(extract, "CACHE_TTL_SECONDS", 0):
+            extract.cache_page_ocr("doc-a", 1, "sampling", "a1")
+        assert extract.get_cached_page_ocr("doc-a", 1, "sampling") is None
+        assert extract._page_keys_by_doc == {}
+
+    def test_get_document_page_count(self, tmp_path):
+        """Test counting pages from the zip directory."""
+        from remarkable_mcp.extract import get_document_page_count
+
+        zip_path = tmp_path / "doc.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc.content", "{}")
+            zf.writestr("doc/page-1.rm", b"")
+            zf.writestr("doc/page-2.rm", b"")
+
+        assert get_document_page_count(zip_path) == 2
+
+    def test_ordered_rm_names_follow_content_page_order(self, tmp_path):
+        """Test that page order comes from the .content file without extracting."""
+        from remarkable_mcp.extract import _get_ordered_rm_names
+
+        zip_path = tmp_path / "doc.zip"
+        content = {"cPages": {"pages": [{"id": "p2"}, {"id": "p1"}]}}
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("doc.content", json.dumps(content))
+            zf.writestr("doc/p1.rm", b"")
+            zf.writestr("doc/p3.rm", b"")
+            zf.writestr("doc/p2.rm", b"")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            assert _get_ordered_rm_names(zf) == ["doc/p2.rm", "doc/p1.rm", "doc/p3.rm"]
+
+    def test_ordered_rm_files_follow_content_page_order(self, tmp_path):
+        """Test ordering extracted .rm files, with unlisted pages kept at the end."""
+        from remarkable_mcp.extract import _get_ordered_rm_files
+
+        (tmp_path / "doc.content").write_text(json.dumps({"pages": ["p2", "missing", "p1"]}))
+        (tmp_path / "doc").mkdir()
+        for page_id in ("p1", "p2", "p3"):
+            (tmp_path / "doc" / f"{page_id}.rm").write_bytes(b"")
+
+        ordered, page_ids = _get_ordered_rm_files(tmp_path)
+        assert [f.stem for f in ordered] == ["p2", "p1", "p3"]
+        assert page_ids == ["p2", "p1", "p3"]
+
+    def test_extract_text_from_rm_file_reads_root_text_only(self, tmp_path):
+        """Test that only root text blocks contribute typed text."""
+        import sys
+        import types
+
+        class RootTextBlock:
+            def __init__(self, runs):
+                self.value = types.SimpleNamespace(items=runs)
+
+        rmscene = types.ModuleType("rmscene")
+        scene_stream = types.ModuleType("rmscene.scene_stream")
+        scene_stream.RootTextBlock = RootTextBlock
+        rmscene.read_blocks = lambda f: iter(
+            [object(), RootTextBlock(["Hello ", 1, "world\n", "\n", "second line"]), object()]
+        )
+
+        rm_file = tmp_path / "page.rm"
+        rm_file.write_bytes(b"")
+        with patch.dict(sys.modules, {"rmscene": rmscene, "rmscene.scene_stream": scene_stream}):
+            assert extract_text_from_rm_file(rm_file) == ["Hello world", "second line"]
+
+    def test_extract_text_from_rm_files_keeps_order(self, tmp_path):
+        """Test that parallel .rm text extraction returns pages in order."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from remarkable_mcp.extract import PARALLEL_TEXT_MIN_PAGES, _extract_text_from_rm_files
+
+        count = PARALLEL_TEXT_MIN_PAGES + 2
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(count)]
+        for i, rm_file in enumerate(rm_files):
+            rm_file.write_bytes(f"{i}".encode())
+
+        def parse_page(rm_file):
+            # Earlier pages finish last
+            i = int(rm_file.read_bytes())
+            time.sleep((count - i) * 0.005)
+            return [f"page {i}"]
+
+        with (
+            ThreadPoolExecutor(max_workers=count) as pool,
+            patch("remarkable_mcp.extract._get_process_pool", return_value=pool),
+            patch("remarkable_mcp.extract.extract_text_from_rm_file", side_effect=parse_page),
+        ):
+            assert _extract_text_from_rm_files(rm_files) == [[f"page {i}"] for i in range(count)]
+
+    def test_process_pool_is_shared_and_avoids_fork(self):
+        """Test that one worker pool is reused across calls and doesn't fork the server."""
+        from remarkable_mcp import extract
+
+        extract._discard_process_pool()
+        try:
+            pool = extract._get_process_pool()
+            assert extract._get_process_pool() is pool
+            assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        finally:
+            extract._discard_process_pool()
+        assert extract._process_pool is None
+
+    def test_extract_text_from_rm_files_caches_by_content(self, tmp_path):
+        """Test that unchanged and duplicate pages are only parsed once."""
+        import io
+
+        from remarkable_mcp.extract import _extract_text_from_rm_files
+
+        def parse_page(f):
+            data = f.getvalue() if isinstance(f, io.BytesIO) else f.read_bytes()
+            return [data.decode()]
+
+        rm_file = tmp_path / "p0.rm"
+        rm_file.write_bytes(b"page one")
+        with patch(
+            "remarkable_mcp.extract.extract_text_from_rm_file", side_effect=parse_page
+        ) as parse:
+            pages = [rm_file, io.BytesIO(b"page two"), io.BytesIO(b"page one")]
+            assert _extract_text_from_rm_files(pages) == [
+                ["page one"],
+                ["page two"],
+                ["page one"],
+            ]
+            assert parse.call_count == 2
+
+            # Re-reading the document (e.g. to add OCR) parses nothing again
+            assert _extract_text_from_rm_files([rm_file]) == [["page one"]]
+            assert parse.call_count == 2
+
+    def test_google_vision_rest_ocr_pages(self, tmp_path):
+        """Test that REST OCR keeps page order and falls back on auth errors."""
+        from remarkable_mcp.extract import _ocr_google_vision_rest
+
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(3)]
+        images = [b"png0", b"png1", b"png2"]
+        texts = {b"png0": "text 0", b"png1": None, b"png2": "text 2"}
+        status = {"code": 200}
+
+        def annotate(batch, key):
+            return ([texts[png] for png in batch], status["code"])
+
+        with (
+            patch("remarkable_mcp.extract._render_pages_for_ocr", return_value=images),
+            patch("remarkable_mcp.extract.VISION_BATCH_SIZE", 2),
+            patch("remarkable_mcp.extract._ocr_google_vision_rest_batch", side_effect=annotate),
+        ):
+            assert _ocr_google_vision_rest(rm_files, "key") == ["text 0", "text 2"]
+
+            status["code"] = 403
+            with patch("remarkable_mcp.extract._ocr_tesseract", return_value=["local"]) as tess:
+                assert _ocr_google_vision_rest(rm_files, "key") == ["local"]
+                tess.assert_called_once_with(rm_files)
+
+        with patch("remarkable_mcp.extract._render_pages_for_ocr", side_effect=FileNotFoundError):
+            assert _ocr_google_vision_rest(rm_files, "key") is None
+
+    def test_ocr_disk_cache(self):
+        """Test that cached pages skip the backend and entries are per backend and expire."""
+        from remarkable_mcp.extract import _ocr_with_disk_cache, get_disk_cached_ocr
+
+        calls = []
+
+        def ocr_pages(pages):
+            calls.append(pages)
+            return [None if png == b"blank" else png.decode().upper() for png in pages]
+
+        images = [b"one", b"blank", b"two"]
+        assert _ocr_with_disk_cache(images, "tesseract", ocr_pages) == ["ONE", None, "TWO"]
+        assert _ocr_with_disk_cache(images, "tesseract", ocr_pages) == ["ONE", None, "TWO"]
+        # Only the page without text is retried
+        assert calls == [images, [b"blank"]]
+
+        assert get_disk_cached_ocr(images, "google") == [None, None, None]
+        with patch("remarkable_mcp.extract.DISK_CACHE_TTL_SECONDS", 0):
+            assert get_disk_cached_ocr(images, "tesseract") == [None, None, None]
+        assert get_disk_cached_ocr(images, "tesseract") == [None, None, None]
+
+    def test_disk_cache_evicts_least_recently_used(self, tmp_path):
+        """Test that pruning drops expired entries, then the oldest past the size cap."""
+        import os
+        import time
+
+        from remarkable_mcp.extract import _prune_disk_cache
+
+        cache_dir = tmp_path / "cache"
+        (cache_dir / "ab").mkdir(parents=True)
+        now = time.time()
+        for name, age in [("old", 10), ("mid", 5), ("new", 0), ("stale", 10**9)]:
+            path = cache_dir / "ab" / name
+            path.write_bytes(b"x" * 10)
+            os.utime(path, (now - age, now - age))
+
+        _prune_disk_cache(cache_dir, max_bytes=20)
+        assert sorted(p.name for p in (cache_dir / "ab").iterdir()) == ["mid", "new"]
+
+        # Pruning again within the interval is a no-op
+        (cache_dir / "ab" / "extra").write_bytes(b"x" * 10)
+        _prune_disk_cache(cache_dir, max_bytes=20)
+        assert len(list((cache_dir / "ab").iterdir())) == 3
+
+    def test_ocr_deduplicates_identical_pages(self):
+        """Test that identical rendered pages are OCR'd once and fanned back out."""
+        from remarkable_mcp.extract import _ocr_with_disk_cache
+
+        calls = []
+
+        def ocr_pages(pages):
+            calls.append(pages)
+            return [png.decode() for png in pages]
+
+        images = [b"grid", b"notes", b"grid", b"grid"]
+        assert _ocr_with_disk_cache(images, "tesseract", ocr_pages) == [
+            "grid",
+            "notes",
+            "grid",
+            "grid",
+        ]
+        assert calls == [[b"grid", b"notes"]]
+
+    def test_tiered_ocr_escalates_low_confidence_pages(self, tmp_path, monkeypatch):
+        """Test that tiered OCR sends only low-confidence Tesseract pages to Vision."""
+        import sys
+        from types import SimpleNamespace
+
+        from remarkable_mcp.extract import _ocr_tiered
+
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(3)]
+        scores = {
+            b"printed": ("Printed heading text", 91.0),
+            b"scrawl": ("~~ ,", 20.0),
+            b"short": ("ok", 95.0),
+        }
+        vision_pages = []
+
+        def vision(pages, api_key):
+            vision_pages.extend(pages)
+            return ([f"vision {png.decode()}" for png in pages], [200])
+
+        monkeypatch.setenv("GOOGLE_VISION_API_KEY", "key")
+        ocr_modules = {"pytesseract": SimpleNamespace(), "PIL": SimpleNamespace(Image=None)}
+        with (
+            patch.dict(sys.modules, ocr_modules),
+            patch(
+                "remarkable_mcp.extract._render_pages_for_ocr",
+                return_value=[b"printed", b"scrawl", b"short"],
+            ),
+            patch("remarkable_mcp.extract._tesseract_page_scored", side_effect=scores.get),
+            patch("remarkable_mcp.extract._vision_rest_pages", side_effect=vision),
+        ):
+            assert _ocr_tiered(rm_files) == [
+                "Printed heading text",
+                "vision scrawl",
+                "vision short",
+            ]
+        assert vision_pages == [b"scrawl", b"short"]
+
+    def test_google_vision_rest_batch_request(self):
+        """Test that one request carries the whole batch and per-page errors are isolated."""
+        from remarkable_mcp.extract import _ocr_google_vision_rest_batch
+
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            "responses": [
+                {"fullTextAnnotation": {"text": " first \n"}},
+                {"error": {"code": 3, "message": "bad image"}},
+                {},
+            ]
+        }
+        session = Mock()
+        session.post.return_value = response
+        with patch("remarkable_mcp.extract._get_vision_session", return_value=session):
+            texts, status = _ocr_google_vision_rest_batch([b"a", b"b", b"c"], "key")
+
+        assert (texts, status) == (["first", None, None], 200)
+        session.post.assert_called_once()
+        assert len(session.post.call_args.kwargs["json"]["requests"]) == 3
+
+    def test_google_vision_rest_batch_retries(self):
+        """Test that rate-limited and 5xx responses are retried with backoff."""
+        from remarkable_mcp.extract import VISION_MAX_RETRIES, _ocr_google_vision_rest_batch
+
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"responses": [{"fullTextAnnotation": {"text": "page"}}]}
+        session = Mock()
+        session.post.side_effect = [Mock(status_code=429), Mock(status_code=503), ok]
+
+        with (
+            patch("remarkable_mcp.extract._get_vision_session", return_value=session),
+            patch("remarkable_mcp.extract.time.sleep") as sleep,
+        ):
+            assert _ocr_google_vision_rest_batch([b"a"], "key") == (["page"], 200)
+            assert sleep.call_count == 2
+
+            session.post.side_effect = None
+            session.post.return_value = Mock(status_code=503)
+            sleep.reset_mock()
+            assert _ocr_google_vision_rest_batch([b"a"], "key") == ([None], 503)
+            assert sleep.call_count == VISION_MAX_RETRIES
+
+            # Auth errors are not retried
+            session.post.return_value = Mock(status_code=403)
+            sleep.reset_mock()
+            assert _ocr_google_vision_rest_batch([b"a"], "key") == ([None], 403)
+            sleep.assert_not_called()
+
+    def test_google_vision_rest_batch_retries_timeouts(self):
+        """Test that timed-out requests are retried and the budget scales with the batch."""
+        from remarkable_mcp.extract import (
+            OCR_TIMEOUT_SECONDS,
+            VISION_MAX_RETRIES,
+            _ocr_google_vision_rest_batch,
+        )
+
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"responses": [{"fullTextAnnotation": {"text": "page"}}] * 3}
+        session = Mock()
+        session.post.side_effect = [TimeoutError("read timed out"), ok]
+
+        with (
+            patch("remarkable_mcp.extract._get_vision_session", return_value=session),
+            patch("remarkable_mcp.extract.time.sleep") as sleep,
+        ):
+            texts, status = _ocr_google_vision_rest_batch([b"a", b"b", b"c"], "key")
+            assert (texts, status) == (["page"] * 3, 200)
+            assert sleep.call_count == 1
+            assert session.post.call_args.kwargs["timeout"] == OCR_TIMEOUT_SECONDS * 3
+
+            session.post.side_effect = ConnectionError("reset")
+            session.post.reset_mock()
+            assert _ocr_google_vision_rest_batch([b"a"], "key") == ([None], None)
+            assert session.post.call_count == VISION_MAX_RETRIES + 1
+
+    def test_rm_to_svg_in_process_times_out(self, tmp_path):
+        """Test that a stuck in-process rmc render is abandoned after the render budget."""
+        import subprocess
+        import sys
+        import threading
+        import types
+
+        from remarkable_mcp.extract import _rm_to_svg_bytes_in_process
+
+        release = threading.Event()
+        rmscene = types.ModuleType("rmscene")
+        rmscene.read_tree = lambda f: release.wait(5)
+        svg_module = types.ModuleType("rmc.exporters.svg")
+        svg_module.tree_to_svg = lambda tree, output: output.write("<svg/>")
+        modules = {
+            "rmscene": rmscene,
+            "rmc": types.ModuleType("rmc"),
+            "rmc.exporters": types.ModuleType("rmc.exporters"),
+            "rmc.exporters.svg": svg_module,
+        }
+
+        rm_file = tmp_path / "page.rm"
+        rm_file.write_bytes(b"")
+        try:
+            with (
+                patch.dict(sys.modules, modules),
+                patch("remarkable_mcp.extract.RENDER_TIMEOUT_SECONDS", 0.05),
+            ):
+                with pytest.raises(subprocess.TimeoutExpired):
+                    _rm_to_svg_bytes_in_process(rm_file)
+                release.set()
+                assert _rm_to_svg_bytes_in_process(rm_file) == b"<svg/>"
+        finally:
+            release.set()
+
+    def test_vision_retry_delay_honors_retry_after(self):
+        """Test that Retry-After is used for the backoff delay when present."""
+        from remarkable_mcp.extract import VISION_MAX_BACKOFF_SECONDS, _vision_retry_delay
+
+        assert _vision_retry_delay(Mock(headers={"Retry-After": "7"}), 0) == 7
+        assert _vision_retry_delay(Mock(headers={"Retry-After": "3600"}), 0) == (
+            VISION_MAX_BACKOFF_SECONDS
+        )
+        # HTTP-date values and missing headers fall back to exponential backoff
+        delay = _vision_retry_delay(Mock(headers={"Retry-After": "Wed, 21 Oct 2026"}), 2)
+        assert 4 <= delay < 5
+        assert 1 <= _vision_retry_delay(Mock(headers={}), 0) < 2
+        assert 2 <= _vision_retry_delay(None, 1) < 3
+
+    def test_vision_session_falls_back_without_http2(self):
+        """Test that Vision uses a pooled requests session when h2 is missing."""
+        import sys
+
+        import requests
+
+        from remarkable_mcp.extract import _new_vision_session
+
+        with patch.dict(sys.modules, {"h2": None}):
+            assert isinstance(_new_vision_session(), requests.Session)
+
+    def test_vision_images_jpeg(self, monkeypatch):
+        """Test that Vision pages are sent as PNG unless JPEG is requested."""
+        import io
+
+        PILImage = pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import _vision_cache_key, _vision_images
+
+        raw = io.BytesIO()
+        PILImage.new("L", (1404, 1872), 255).save(raw, format="PNG")
+        page = raw.getvalue()
+
+        assert _vision_images([page]) == [page]
+        assert _vision_cache_key("google") == "google"
+
+        monkeypatch.setenv("REMARKABLE_VISION_IMAGE_FORMAT", "jpeg")
+        (jpeg,) = _vision_images([page])
+        img = PILImage.open(io.BytesIO(jpeg))
+        assert img.format == "JPEG"
+        assert max(img.size) == 1024
+        assert _vision_cache_key("google") == "google:jpeg"
+
+    def test_vision_batches(self):
+        """Test splitting pages by batch size and by request bytes."""
+        from remarkable_mcp.extract import _vision_batches
+
+        with patch("remarkable_mcp.extract.VISION_BATCH_SIZE", 2):
+            assert _vision_batches([b"a", b"b", b"c"]) == [[b"a", b"b"], [b"c"]]
+        with patch("remarkable_mcp.extract.VISION_BATCH_BYTES", 5):
+            assert _vision_batches([b"aaa", b"bbb"]) == [[b"aaa"], [b"bbb"]]
+
+    def test_vision_workers(self, monkeypatch):
+        """Test that REMARKABLE_OCR_CONCURRENCY sets the number of concurrent Vision requests."""
+        from remarkable_mcp.extract import _vision_workers
+
+        monkeypatch.delenv("REMARKABLE_OCR_CONCURRENCY", raising=False)
+        assert _vision_workers(2) == 2
+        assert _vision_workers(20) == 3
+
+        monkeypatch.setenv("REMARKABLE_OCR_CONCURRENCY", "8")
+        assert _vision_workers(20) == 8
+        monkeypatch.setenv("REMARKABLE_OCR_CONCURRENCY", "100")
+        assert _vision_workers(20) == 16
+        monkeypatch.setenv("REMARKABLE_OCR_CONCURRENCY", "0")
+        assert _vision_workers(20) == 1
+
+    def test_render_pages_for_ocr_keeps_order(self, tmp_path, monkeypatch):
+        """Test that pages rendered for OCR come back in page order."""
+        from remarkable_mcp.extract import _render_pages_for_ocr
+
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(3)]
+        monkeypatch.setenv("REMARKABLE_RENDER_WORKERS", "1")
+        with patch(
+            "remarkable_mcp.extract._render_rm_to_png_bytes",
+            side_effect=lambda f, width, height: f"{f.stem}:{width}x{height}".encode(),
+        ):
+            assert _render_pages_for_ocr(rm_files, 10, 20) == [
+                b"p0:10x20",
+                b"p1:10x20",
+                b"p2:10x20",
+            ]
+
+    def test_render_pages_for_ocr_disk_cache(self, tmp_path, monkeypatch):
+        """Test that unchanged pages are read from the render cache on later runs."""
+        from remarkable_mcp.extract import _render_pages_for_ocr
+
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(2)]
+        for rm_file in rm_files:
+            rm_file.write_bytes(rm_file.stem.encode())
+        monkeypatch.setenv("REMARKABLE_RENDER_WORKERS", "1")
+
+        with patch(
+            "remarkable_mcp.extract._render_rm_to_png_bytes",
+            side_effect=lambda f, width, height: f.read_bytes() + b".png",
+        ) as render:
+            assert _render_pages_for_ocr(rm_files) == [b"p0.png", b"p1.png"]
+            assert _render_pages_for_ocr(rm_files) == [b"p0.png", b"p1.png"]
+            assert render.call_count == 2
+
+            rm_files[1].write_bytes(b"edited")
+            assert _render_pages_for_ocr(rm_files) == [b"p0.png", b"edited.png"]
+            assert render.call_count == 3
+
+            # Renders at another size are cached separately
+            _render_pages_for_ocr(rm_files, 10, 20)
+            assert render.call_count == 5
+
+    def test_render_pages_for_ocr_disk_cache_disabled(self, tmp_path, monkeypatch):
+        """Test that REMARKABLE_DISK_CACHE=off neither reads nor writes page renders."""
+        from remarkable_mcp import extract
+
+        rm_file = tmp_path / "p0.rm"
+        rm_file.write_bytes(b"p0")
+        monkeypatch.setenv("REMARKABLE_RENDER_WORKERS", "1")
+        monkeypatch.setenv("REMARKABLE_DISK_CACHE", "off")
+
+        with patch("remarkable_mcp.extract._render_rm_to_png_bytes", return_value=b"png") as render:
+            extract._render_pages_for_ocr([rm_file])
+            extract._render_pages_for_ocr([rm_file])
+            assert render.call_count == 2
+        assert not extract.PAGE_RENDER_CACHE_DIR.exists()
+
+    def test_render_pages_for_ocr_renders_duplicates_once(self, tmp_path, monkeypatch):
+        """Test that pages with identical content are rendered once per run."""
+        from remarkable_mcp.extract import _render_pages_for_ocr
+
+        rm_files = [tmp_path / f"p{i}.rm" for i in range(3)]
+        for rm_file, content in zip(rm_files, [b"blank", b"ink", b"blank"]):
+            rm_file.write_bytes(content)
+        monkeypatch.setenv("REMARKABLE_RENDER_WORKERS", "1")
+
+        with patch(
+            "remarkable_mcp.extract._render_rm_to_png_bytes",
+            side_effect=lambda f, width, height: f.read_bytes() + b".png",
+        ) as render:
+            assert _render_pages_for_ocr(rm_files) == [b"blank.png", b"ink.png", b"blank.png"]
+            assert render.call_count == 2
+
+    def test_render_rm_file_to_svg_adds_background(self, tmp_path):
+        """Test that SVG rendering uses rmc output directly and adds the background."""
+        from remarkable_mcp.extract import render_rm_file_to_svg
+
+        svg = b'<svg viewBox="0 0 10 20"><g/></svg>'
+        with patch("remarkable_mcp.extract._rm_to_svg_bytes", return_value=svg):
+            assert render_rm_file_to_svg(tmp_path / "page.rm") == svg.decode()
+            rendered = render_rm_file_to_svg(tmp_path / "page.rm", "#FBFBFB")
+        assert '<rect x="0" y="0" width="10" height="20" fill="#FBFBFB"/>' in rendered
+
+        with patch("remarkable_mcp.extract._rm_to_svg_bytes", side_effect=FileNotFoundError):
+            assert render_rm_file_to_svg(tmp_path / "page.rm") is None
+
+    def test_extract_text_from_pdf_skips_empty_pages(self, tmp_path):
+        """Test that PDF text is labelled by page number, skipping blank pages."""
+        fitz = pytest.importorskip("fitz")
+        from remarkable_mcp.extract import extract_text_from_pdf
+
+        pdf_path = tmp_path / "doc.pdf"
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), "First")
+            doc.new_page()
+            doc.new_page().insert_text((72, 72), "Third")
+            doc.save(pdf_path)
+
+        assert extract_text_from_pdf(pdf_path) == "--- Page 1 ---\nFirst\n\n--- Page 3 ---\nThird"
+
+    def test_html_to_text(self):
+        """Test EPUB item text extraction keeps one stripped string per line."""
+        pytest.importorskip("lxml")
+        from remarkable_mcp.extract import _html_to_text
+
+        content = (
+            b'<?xml version="1.0" encoding="utf-8"?>'
+            b'<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Title</title>'
+            b"<style>p { color: red; }</style></head>"
+            b"<body><!-- note --><h1> Chapter 1 </h1><p>Some <em>text</em></p></body></html>"
+        )
+        assert _html_to_text(content) == "Title\nChapter 1\nSome\ntext"
+        assert _html_to_text(b"") == ""
+
+    def test_render_rm_file_to_png_svg_backend(self, tmp_path, monkeypatch):
+        """Test that resvg is preferred when installed and the backend can be overridden."""
+        import sys
+        import types
+
+        from remarkable_mcp.extract import render_rm_file_to_png
+
+        calls = []
+        resvg_py = types.ModuleType("resvg_py")
+        resvg_py.svg_to_bytes = lambda **kwargs: calls.append(kwargs) or [0x89, 0x50]
+        svg = b'<svg viewBox="0 0 100 200"></svg>'
+
+        with (
+            patch.dict(sys.modules, {"resvg_py": resvg_py}),
+            patch("remarkable_mcp.extract._rm_to_svg_bytes", return_value=svg),
+            patch("remarkable_mcp.extract._svg_to_png_inkscape", return_value=b"inkscape"),
+        ):
+            assert render_rm_file_to_png(tmp_path / "page.rm", "#FBFBFB") == b"\x89P"
+            assert calls[0]["background"] == "#FBFBFB"
+            assert (calls[0]["width"], calls[0]["height"]) == (200, 300)
+
+            monkeypatch.setenv("REMARKABLE_SVG_BACKEND", "inkscape")
+            assert render_rm_file_to_png(tmp_path / "page.rm") == b"inkscape"
+            assert len(calls) == 1
+
+            monkeypatch.setenv("REMARKABLE_SVG_BACKEND", "skia")
+            with patch("remarkable_mcp.extract._svg_to_png_skia", return_value=b"skia") as skia:
+                assert render_rm_file_to_png(tmp_path / "page.rm") == b"skia"
+                skia.assert_called_once_with(svg, 200, 300, None)
+            assert len(calls) == 1
+
+    def test_parse_hex_color(self):
+        """Test parsing RGB/RGBA hex colors, with white for invalid input."""
+        from remarkable_mcp.extract import _parse_hex_color
+
+        assert _parse_hex_color("#FBFBFB") == (251, 251, 251, 255)
+        assert _parse_hex_color("#FFFFFF80") == (255, 255, 255, 128)
+        assert _parse_hex_color("#GGGGGG") == (255, 255, 255, 255)
+        assert _parse_hex_color("white") == (255, 255, 255, 255)
+
+    def test_get_svg_content_bounds(self, tmp_path):
+        """Test reading bounds from the root <svg> element."""
+        from remarkable_mcp.extract import _get_svg_content_bounds
+
+        svg = tmp_path / "page.svg"
+        svg.write_text(
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="-10 5 200 300">'
+            '<path d="M 0 0 L 1 1"/></svg>'
+        )
+        assert _get_svg_content_bounds(svg) == (-10.0, 5.0, 200.0, 300.0)
+
+        svg.write_text('<svg width="100px" height="50"></svg>')
+        assert _get_svg_content_bounds(svg) == (0, 0, 100.0, 50.0)
+
+        svg.write_text("not xml")
+        assert _get_svg_content_bounds(svg) is None
+
+        assert _get_svg_content_bounds(b'<svg viewBox="0 0 1 2"></svg>') == (0.0, 0.0, 1.0, 2.0)
+
+    def test_rm_to_svg_bytes_reads_rmc_stdout(self, tmp_path):
+        """Test that rmc output is read from stdout, with an output-file fallback."""
+        import subprocess
+
+        from remarkable_mcp.extract import _rm_to_svg_bytes
+
+        rm_file = tmp_path / "page.rm"
+        svg = b"<svg></svg>"
+
+        with (
+            patch("remarkable_mcp.extract._rm_to_svg_bytes_in_process", return_value=None),
+            patch(
+                "subprocess.run",
+                return_value=subprocess.CompletedProcess([], 0, stdout=svg, stderr=b""),
+            ) as run,
+        ):
+            assert _rm_to_svg_bytes(rm_file) == svg
+            assert "-o" not in run.call_args.args[0]
+
+        def write_output_file(cmd, **kwargs):
+            if "-o" in cmd:
+                Path(cmd[cmd.index("-o") + 1]).write_bytes(svg)
+            return subprocess.CompletedProcess(cmd, 0, stdout=b"", stderr=b"")
+
+        with (
+            patch("remarkable_mcp.extract._rm_to_svg_bytes_in_process", return_value=None),
+            patch("subprocess.run", side_effect=write_output_file),
+        ):
+            assert _rm_to_svg_bytes(rm_file) == svg
+
+        with (
+            patch("remarkable_mcp.extract._rm_to_svg_bytes_in_process", return_value=None),
+            patch(
+                "subprocess.run",
+                return_value=subprocess.CompletedProcess([], 1, stdout=b"", stderr=b"error"),
+            ),
+        ):
+            assert _rm_to_svg_bytes(rm_file) is None
+
+    def test_rm_to_svg_bytes_in_process(self, tmp_path):
+        """Test that the rmc library is used in-process when it can be imported."""
+        import sys
+        from types import ModuleType, SimpleNamespace
+
+        from remarkable_mcp.extract import _rm_to_svg_bytes
+
+        rm_file = tmp_path / "page.rm"
+        rm_file.write_bytes(b"lines")
+        svg_module = ModuleType("rmc.exporters.svg")
+        svg_module.tree_to_svg = lambda tree, output: output.write(f"<svg>{tree}</svg>")
+        rmscene = SimpleNamespace(read_tree=lambda f: f.read().decode())
+
+        with (
+            patch.dict(sys.modules, {"rmc.exporters.svg": svg_module, "rmscene": rmscene}),
+            patch("subprocess.run") as run,
+        ):
+            assert _rm_to_svg_bytes(rm_file) == b"<svg>lines</svg>"
+            run.assert_not_called()
+
+    def test_svg_to_png_inkscape_pipes(self):
+        """Test that inkscape is piped through stdin/stdout, with a temp-file fallback."""
+        import subprocess
+
+        from remarkable_mcp.extract import _svg_to_png_inkscape
+
+        png = b"\x89PNG\r\n\x1a\npixels"
+
+        with patch(
+            "subprocess.run",
+            return_value=subprocess.CompletedProcess([], 0, stdout=png, stderr=b""),
+        ) as run:
+            assert _svg_to_png_inkscape(b"<svg></svg>") == png
+            assert run.call_args.kwargs["input"] == b"<svg></svg>"
+
+        def write_output_file(cmd, **kwargs):
+            if "--pipe" in cmd:
+                return subprocess.CompletedProcess(cmd, 1, stdout=b"", stderr=b"unknown option")
+            Path(cmd[cmd.index("--export-filename") + 1]).write_bytes(png)
+            return subprocess.CompletedProcess(cmd, 0, stdout=b"", stderr=b"")
+
+        with patch("subprocess.run", side_effect=write_output_file):
+            assert _svg_to_png_inkscape(b"<svg></svg>") == png
+
+    def test_composite_on_background(self):
+        """Test compositing a transparent render onto opaque and translucent colors."""
+        PILImage = pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import _composite_on_background
+
+        img = PILImage.new("RGBA", (2, 1), (0, 0, 0, 0))
+        img.putpixel((0, 0), (0, 0, 0, 255))
+
+        opaque = _composite_on_background(img, (251, 251, 251, 255))
+        assert opaque.mode == "RGB"
+        assert opaque.getpixel((0, 0)) == (0, 0, 0)
+        assert opaque.getpixel((1, 0)) == (251, 251, 251)
+
+        translucent = _composite_on_background(img, (255, 255, 255, 128))
+        assert translucent.mode == "RGBA"
+        assert translucent.getpixel((1, 0)) == (255, 255, 255, 128)
+
+    def test_render_rm_to_png_bytes_grayscale(self, tmp_path):
+        """Test that OCR renders are grayscale strokes composited onto white."""
+        import io
+        import sys
+        from types import SimpleNamespace
+
+        PILImage = pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import TESSERACT_INK_THRESHOLD, _render_rm_to_png_bytes
+
+        render = PILImage.new("RGBA", (4, 1), (0, 0, 0, 0))
+        render.putpixel((0, 0), (0, 0, 0, 255))
+        # White pen and translucent yellow highlighter must not turn into ink
+        render.putpixel((2, 0), (255, 255, 255, 255))
+        render.putpixel((3, 0), (255, 235, 0, 128))
+        raw = io.BytesIO()
+        render.save(raw, format="PNG")
+        cairosvg = SimpleNamespace(svg2png=lambda **kwargs: raw.getvalue())
+
+        with (
+            patch("remarkable_mcp.extract._rm_to_svg_bytes", return_value=b"<svg></svg>"),
+            patch.dict(sys.modules, {"cairosvg": cairosvg}),
+        ):
+            png_bytes = _render_rm_to_png_bytes(tmp_path / "page.rm", 4, 1)
+
+        img = PILImage.open(io.BytesIO(png_bytes))
+        assert img.mode == "L"
+        assert [img.getpixel((x, 0)) for x in range(3)] == [0, 255, 255]
+        assert img.getpixel((3, 0)) > TESSERACT_INK_THRESHOLD
+
+    def test_white_page_is_reused_and_cleared(self):
+        """Test that OCR renders reuse one white page per size, cleared between pages."""
+        pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import _white_page
+
+        page = _white_page((4, 2))
+        page.putpixel((1, 1), 0)
+        again = _white_page((4, 2))
+        assert again is page
+        assert again.getpixel((1, 1)) == 255
+        assert _white_page((2, 2)).size == (2, 2)
+
+    def test_blank_pages_skip_ocr_render(self, tmp_path, monkeypatch):
+        """Test that tiny SVGs with few strokes are not rendered for OCR."""
+        from remarkable_mcp.extract import _is_blank_svg, _render_rm_to_png_bytes
+
+        blank = b'<svg><polyline points="0,0 1,1"/></svg>'
+        drawn = b"<svg>" + b'<polyline points="0,0 1,1"/>' * 3 + b"</svg>"
+        assert _is_blank_svg(blank)
+        assert not _is_blank_svg(drawn)
+        assert not _is_blank_svg(blank + b" " * 2048)
+
+        monkeypatch.setenv("REMARKABLE_BLANK_PATH_THRESHOLD", "1")
+        assert not _is_blank_svg(blank)
+        monkeypatch.delenv("REMARKABLE_BLANK_PATH_THRESHOLD")
+
+        with (
+            patch("remarkable_mcp.extract._rm_to_svg_bytes", return_value=blank),
+            patch("remarkable_mcp.extract._svg_to_png_inkscape") as inkscape,
+        ):
+            assert _render_rm_to_png_bytes(tmp_path / "page.rm") == b""
+            inkscape.assert_not_called()
+
+    def test_tesseract_page_binarizes(self):
+        """Test that Tesseract receives a 1-bit image thresholded at the ink level."""
+        import io
+        import sys
+        import threading
+        from types import SimpleNamespace
+
+        PILImage = pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import TESSERACT_INK_THRESHOLD, _tesseract_page
+
+        page = PILImage.new("L", (3, 1), 255)
+        page.putpixel((0, 0), 0)
+        page.putpixel((1, 0), TESSERACT_INK_THRESHOLD - 1)
+        raw = io.BytesIO()
+        page.save(raw, format="PNG")
+
+        seen = []
+
+        def image_to_string(img, config, timeout):
+            seen.append(img)
+            return " words \n"
+
+        pytesseract = SimpleNamespace(image_to_string=image_to_string)
+        with (
+            patch.dict(sys.modules, {"pytesseract": pytesseract, "tesserocr": None}),
+            patch("remarkable_mcp.extract._tesserocr_local", threading.local()),
+        ):
+            assert _tesseract_page(raw.getvalue()) == "words"
+
+        assert seen[0].mode == "1"
+        assert [seen[0].getpixel((x, 0)) for x in range(3)] == [0, 0, 255]
+
+    def test_tesseract_page_reuses_tesserocr_api(self):
+        """Test that tesserocr's API is created once per thread and reused across pages."""
+        import io
+        import sys
+        import threading
+        from types import SimpleNamespace
+
+        PILImage = pytest.importorskip("PIL.Image")
+        from remarkable_mcp.extract import _tesseract_page
+
+        raw = io.BytesIO()
+        PILImage.new("L", (2, 2), 255).save(raw, format="PNG")
+
+        apis = []
+
+        class FakeAPI:
+            def __init__(self, psm, oem):
+                apis.append(self)
+
+            def SetImage(self, img):
+                self.img = img
+
+            def Recognize(self, timeout):
+                return True
+
+            def GetUTF8Text(self):
+                return f"page {len(apis)}\n"
+
+        tesserocr = SimpleNamespace(PyTessBaseAPI=FakeAPI, PSM=Mock(), OEM=Mock())
+        with (
+            patch.dict(sys.modules, {"tesserocr": tesserocr}),
+            patch("remarkable_mcp.extract._tesserocr_local", threading.local()),
+        ):
+            assert _tesseract_page(raw.getvalue()) == "page 1"
+            assert _tesseract_page(raw.getvalue()) == "page 1"
+        assert len(apis) == 1
+
     def test_extract_text_from_rm_file_no_rmscene(self):
         """Test graceful fallback when rmscene not available."""
         # Create a dummy file
@@ -467,6 +1643,38 @@ class TestRemarkableRead:
         assert "_error" in data
         assert data["_error"]["type"] == "document_not_found"
 
+    @pytest.mark.asyncio
+    @patch("remarkable_mcp.tools.get_rmapi")
+    async def test_read_ocr_not_stale_after_edit(self, mock_get_rmapi):
+        """Test that OCR text cached for a document isn't served after it is edited."""
+        import io
+
+        def zip_bytes(page):
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, "w") as zf:
+                zf.writestr("doc/p1.rm", page)
+            return buf.getvalue()
+
+        doc = Mock(VissibleName="Notes", ID="doc-1", Parent="", is_folder=False)
+        doc.ModifiedClient = "2024-01-15T10:30:00Z"
+        mock_client = Mock()
+        mock_get_rmapi.return_value = mock_client
+        mock_client.get_meta_items.return_value = [doc]
+        mock_client.get_file_type.return_value = "notebook"
+
+        def ocr(rm_files):
+            return ([f.read_bytes().decode() for f in rm_files], "tesseract")
+
+        args = {"document": "Notes", "include_ocr": True}
+        with patch("remarkable_mcp.extract.extract_handwriting_ocr", side_effect=ocr):
+            mock_client.download.return_value = zip_bytes(b"first draft")
+            result = await mcp.call_tool("remarkable_read", args)
+            assert json.loads(result[0][0].text)["content"] == "first draft"
+
+            mock_client.download.return_value = zip_bytes(b"edited")
+            result = await mcp.call_tool("remarkable_read", args)
+            assert json.loads(result[0][0].text)["content"] == "edited"
+
 
 # =============================================================================
 # Test remarkable_image Tool
@@ -519,6 +1727,28 @@ class TestRemarkableImage:
         assert "_error" in data
         assert data["_error"]["type"] == "document_not_found"
 
+    def test_image_ocr_tiered_backend(self):
+        """Test that the image tool's OCR uses the tiered policy instead of plain Tesseract."""
+        from remarkable_mcp.tools import _ocr_png
+
+        with (
+            patch("remarkable_mcp.tools.get_ocr_backend", return_value="tiered"),
+            patch("remarkable_mcp.tools.ocr_images_tiered", return_value=["words"]) as tiered,
+            patch("remarkable_mcp.tools._ocr_png_tesseract") as tesseract,
+        ):
+            assert _ocr_png(b"png") == ("words", "tiered")
+            tiered.assert_called_once_with([b"png"])
+            tesseract.assert_not_called()
+
+            tiered.return_value = [None]
+            assert _ocr_png(b"png") == (None, None)
+
+        with (
+            patch("remarkable_mcp.tools.get_ocr_backend", return_value="tesseract"),
+            patch("remarkable_mcp.tools._ocr_png_tesseract", return_value="local"),
+        ):
+            assert _ocr_png(b"png") == ("local", "tesseract")
+
     @pytest.mark.asyncio
     async def test_image_compatibility_parameter_in_schema(self):
         """Test that remarkable_image tool has the compatibility parameter in its schema."""
@@ -540,9 +1770,9 @@ class TestRemarkableImage:
 class TestRegistration:
     """Test registration functionality."""
 
-    @patch("requests.post")
-    @patch("pathlib.Path.write_text")
-    def test_register_and_get_token(self, mock_write_text, mock_post):
+    @patch("requests.Session.post")
+    @patch("remarkable_mcp.api._write_rmapi_file")
+    def test_register_and_get_token(self, mock_write_rmapi_file, mock_post):
         """Test registration process."""
         # Mock successful API response
         mock_response = Mock()
@@ -559,12 +1789,13 @@ class TestRegistration:
         assert token_data["devicetoken"] == "test_device_token_12345"
         assert "usertoken" in token_data
 
-        # Verify API was called
+        # Verify the token was saved and the API was called
+        mock_write_rmapi_file.assert_called_once_with(token)
         mock_post.assert_called_once()
         call_args = mock_post.call_args
         assert "webapp-prod.cloud.remarkable.engineering" in call_args[0][0]
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_register_invalid_code(self, mock_post):
         """Test registration with invalid/expired code."""
         # Mock 400 response (invalid code)
@@ -577,6 +1808,121 @@ class TestRegistration:
             register_and_get_token("invalid_code")
 
 
+class TestClientCache:
+    """Test caching of the cloud API client."""
+
+    @patch("remarkable_mcp.api._load_cloud_client")
+    def test_get_rmapi_reuses_client(self, mock_load):
+        """Test that the cloud client is built once and dropped on invalidate."""
+        from remarkable_mcp import api
+
+        mock_load.side_effect = lambda: Mock()
+        api.invalidate_rmapi()
+        with patch.object(api, "use_ssh", return_value=False):
+            first = api.get_rmapi()
+            assert api.get_rmapi() is first
+            assert mock_load.call_count == 1
+
+            api.invalidate_rmapi()
+            assert api.get_rmapi() is not first
+            assert mock_load.call_count == 2
+        api.invalidate_rmapi()
+
+    def test_write_rmapi_file(self, tmp_path):
+        """Test that the token file is replaced atomically and only when changed."""
+        from remarkable_mcp import api
+
+        token_file = tmp_path / ".rmapi"
+        with patch.object(api, "RMAPI_FILE", token_file):
+            api._write_rmapi_file("token-1")
+            assert token_file.read_text() == "token-1"
+
+            mtime = token_file.stat().st_mtime_ns
+            api._write_rmapi_file("token-1")
+            assert token_file.stat().st_mtime_ns == mtime
+
+            api._write_rmapi_file("token-2")
+            assert token_file.read_text() == "token-2"
+        assert [p.name for p in tmp_path.iterdir()] == [".rmapi"]
+
+    def test_use_ssh_reads_env_on_first_use(self, monkeypatch):
+        """Test that SSH mode is read from the environment lazily."""
+        from remarkable_mcp import api
+
+        api.use_ssh.cache_clear()
+        monkeypatch.setenv("REMARKABLE_USE_SSH", "true")
+        try:
+            assert api.use_ssh() is True
+        finally:
+            api.use_ssh.cache_clear()
+
+    def test_meta_items_reused_while_root_unchanged(self):
+        """Test that the cloud listing is only refetched for changed documents."""
+        from remarkable_mcp.sync import RemarkableClient
+
+        root = {"hash": "root-1"}
+        blobs = {
+            "root-1": b"3\ndoc-hash-1:0:doc-1:1:10\n",
+            "root-2": b"3\ndoc-hash-1:0:doc-1:1:10\ndoc-hash-2:0:doc-2:1:20\n",
+            "doc-hash-1": b"3\nmeta-1:0:doc-1.metadata:0:5\n",
+            "doc-hash-2": b"3\nmeta-2:0:doc-2.metadata:0:5\n",
+            "meta-1": b'{"visibleName": "One"}',
+            "meta-2": b'{"visibleName": "Two"}',
+        }
+        fetched = []
+
+        def get_file(file_hash):
+            fetched.append(file_hash)
+            return blobs[file_hash]
+
+        client = RemarkableClient(device_token="device", user_token="user")
+        response = Mock(text="{}", json=lambda: root)
+        with (
+            patch.object(client, "_request", return_value=response),
+            patch.object(client, "_get_file", side_effect=get_file),
+        ):
+            first = client.get_meta_items()
+            assert client.get_meta_items() is first
+            assert fetched == ["root-1", "doc-hash-1", "meta-1"]
+
+            root["hash"] = "root-2"
+            fetched.clear()
+            docs = client.get_meta_items()
+            assert [d.name for d in docs] == ["One", "Two"]
+            assert docs[0] is first[0]
+            assert fetched == ["root-2", "doc-hash-2", "meta-2"]
+
+    def test_meta_items_refetched_after_fetch_failure(self):
+        """Test that a listing with failed blob or metadata fetches is not reused."""
+        from remarkable_mcp.sync import RemarkableClient
+
+        blobs = {
+            "root-1": b"3\ndoc-hash-1:0:doc-1:1:10\ndoc-hash-2:0:doc-2:1:20\n",
+            "doc-hash-1": b"3\nmeta-1:0:doc-1.metadata:0:5\n",
+            "doc-hash-2": b"3\nmeta-2:0:doc-2.metadata:0:5\n",
+            "meta-1": b'{"visibleName": "One"}',
+            "meta-2": b'{"visibleName": "Two"}',
+        }
+        failing = {"doc-hash-1", "meta-2"}
+
+        def get_file(file_hash):
+            if file_hash in failing:
+                raise RuntimeError("network error")
+            return blobs[file_hash]
+
+        client = RemarkableClient(device_token="device", user_token="user")
+        response = Mock(text="{}", json=lambda: {"hash": "root-1"})
+        with (
+            patch.object(client, "_request", return_value=response),
+            patch.object(client, "_get_file", side_effect=get_file),
+        ):
+            # doc-1 is missing and doc-2 is named by its ID
+            assert [d.name for d in client.get_meta_items()] == ["doc-2"]
+
+            failing.clear()
+            assert [d.name for d in client.get_meta_items()] == ["One", "Two"]
+
+
 # =============================================================================
 # End-to-End Tests
 # =============================================================================
@@ -921,6 +2267,18 @@ class TestCapabilityChecking:
         assert callable(get_client_info)
         assert callable(get_protocol_version)
 
+    def test_package_import_is_lazy(self):
+        """Test that importing the package does not load the server stack."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, remarkable_mcp; "
+            "assert 'remarkable_mcp.server' not in sys.modules; "
+            "assert 'remarkable_mcp.capabilities' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
 
 # =============================================================================
 # Test Sampling OCR